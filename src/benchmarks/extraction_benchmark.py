@@ -0,0 +1,199 @@
+"""End-to-end cost of AzureTestExtractor.extract_all against the fake Azure DevOps server, checked against baselines.
+
+Run from the src directory:
+
+    python -m benchmarks.extraction_benchmark --scales 1k 50k [--setting OUTPUT_FORMAT=ndjson] [--update-baseline]
+
+Every scale is extracted in a fresh process, so its peak RSS is its own. The run fails with
+exit status 1 when a metric regressed past its tolerance from the stored baseline. Wall time is
+reported but not compared, as it depends on how fast and how loaded the machine is.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+from benchmarks.fake_azure_devops import FakeAzureDevOpsServer, OrganizationShape, SyntheticOrganization
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where peak RSS is not reported
+    resource = None
+
+SCALES: Dict[str, OrganizationShape] = {
+    # 2 plans x 5 suites x 10 cases x 2 configurations, 5 runs: 1000 results
+    "1k": OrganizationShape(plans=2, suites_per_plan=5, cases_per_suite=10, configurations=2, runs_per_plan=5),
+    # 5 plans x 20 suites x 25 cases x 2 configurations, 10 runs: 50000 results
+    "50k": OrganizationShape(plans=5, suites_per_plan=20, cases_per_suite=25, configurations=2, runs_per_plan=10),
+    # 10 plans x 25 suites x 40 cases x 2 configurations, 50 runs: 1000000 results
+    "1m": OrganizationShape(plans=10, suites_per_plan=25, cases_per_suite=40, configurations=2, runs_per_plan=50),
+}
+
+# Settings of every run; --setting adds to or overrides them
+DEFAULT_SETTINGS = {
+    "api_mode": "raw",
+    "max_concurrent_requests": "8",
+}
+
+# Largest increase over the baseline, as a fraction of it, before a metric counts as regressed.
+# Only metrics that do not depend on CPU speed are compared, so baselines hold on slower machines.
+TOLERANCES = {
+    "api_calls": 0.0,
+    "response_bytes": 0.05,
+    "output_bytes": 0.05,
+    "peak_rss_mb": 0.15,
+}
+
+# Seconds the fake server asks throttled clients to wait
+RETRY_AFTER = 0.1
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "extraction_benchmark.json")
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+def _directory_bytes(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+def run_extraction(organization_url: str, settings: Dict[str, str], output_dir: str) -> Dict[str, Any]:
+    """Extract the organization in the current process and measure it; run in a fresh worker process"""
+    # Imported here so the parent process, which serves the organization, stays lean
+    from config.config import AzureConfig
+    from extractors.azure_test_extractor import AzureTestExtractor
+
+    # No .env file of the working directory is picked up
+    os.chdir(output_dir)
+    config = AzureConfig(organization_url=organization_url, personal_access_token="unused", project_name="Migration", **settings)
+    extractor = AzureTestExtractor(config)
+    extractor.output_dir = output_dir
+    started = time.perf_counter()
+    try:
+        result = asyncio.run(extractor.extract_all())
+    finally:
+        extractor.client.close()
+    wall_seconds = time.perf_counter() - started
+    counts = {name: value if isinstance(value, int) else len(value) for name, value in result.items()}
+    return {
+        "counts": counts,
+        "wall_seconds": round(wall_seconds, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "retries": extractor.client.retry_policy.stats()["retries"],
+    }
+
+def server_parameters(scale: str, latency: float, throttle_rate: float, seed: int) -> Dict[str, Any]:
+    """Fake server parameters a run was measured with; baselines only compare with runs sharing them"""
+    return {
+        "shape": SCALES[scale]._asdict(),
+        "latency": latency,
+        "throttle_rate": throttle_rate,
+        "retry_after": RETRY_AFTER,
+        "seed": seed,
+    }
+
+def benchmark(scale: str, settings: Dict[str, str], latency: float, throttle_rate: float, seed: int) -> Dict[str, Any]:
+    """Serve a scale from this process and extract it in a fresh one"""
+    shape = SCALES[scale]
+    server = FakeAzureDevOpsServer(SyntheticOrganization(shape), latency=latency, throttle_rate=throttle_rate,
+                                   retry_after=RETRY_AFTER, seed=seed)
+    with server, tempfile.TemporaryDirectory() as output_dir:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            run = executor.submit(run_extraction, server.organization_url, settings, output_dir).result()
+        output_bytes = _directory_bytes(output_dir)
+    server_stats = server.stats()
+
+    expected = shape.counts()
+    mismatched = {name: (run["counts"].get(name), count) for name, count in expected.items()
+                  if name in run["counts"] and run["counts"][name] != count}
+    if mismatched:
+        raise RuntimeError(f"Extraction of {scale} returned wrong counts (extracted, served): {mismatched}")
+    entities = sum(count for name, count in run["counts"].items() if name != "identities")
+    return {
+        "settings": settings,
+        "server": server_parameters(scale, latency, throttle_rate, seed),
+        "wall_seconds": run["wall_seconds"],
+        "api_calls": server_stats["requests"],
+        "throttled": server_stats["throttled"],
+        "retries": run["retries"],
+        "entities": entities,
+        "entities_per_second": round(entities / run["wall_seconds"]),
+        "peak_rss_mb": run["peak_rss_mb"],
+        "output_bytes": output_bytes,
+        "response_bytes": server_stats["bytes_sent"],
+    }
+
+def compare(scale: str, metrics: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Regressions of a scale against its baseline"""
+    if baseline.get("settings") != metrics["settings"]:
+        print(f"  {scale}: baseline was measured with {baseline.get('settings')}, not compared")
+        return []
+    if baseline.get("server") != metrics["server"]:
+        # Latency and throttling change wall time and call counts on their own
+        print(f"  {scale}: baseline was measured against a fake server with {baseline.get('server')}, not compared")
+        return []
+    regressions = []
+    for metric, tolerance in TOLERANCES.items():
+        limit = baseline[metric] * (1 + tolerance)
+        if metrics[metric] > limit:
+            regressions.append(f"{scale} {metric}: {metrics[metric]} > {baseline[metric]} baseline (+{tolerance:.0%} tolerated)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end extraction benchmark with regression baselines")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["1k", "50k"], help="Scales to extract")
+    parser.add_argument("--setting", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extractor setting of every run, such as OUTPUT_FORMAT=ndjson (repeatable)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every fake server response is delayed by")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests the fake server answers with 429")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the fake server's latency jitter and throttling")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare with")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the measured metrics as the new baseline")
+    args = parser.parse_args()
+
+    settings = dict(DEFAULT_SETTINGS)
+    for setting in args.setting:
+        name, _, value = setting.partition("=")
+        settings[name.strip().lower()] = value
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)
+
+    regressions = []
+    for scale in args.scales:
+        metrics = benchmark(scale, settings, args.latency, args.throttle_rate, args.seed)
+        print(f"{scale}: {metrics['entities']} entities")
+        for name, value in metrics.items():
+            if name not in ("settings", "server", "entities"):
+                print(f"  {name:<24} {value:>14}")
+        if args.update_baseline:
+            baselines[scale] = metrics
+        elif scale in baselines:
+            regressions.extend(compare(scale, metrics, baselines[scale]))
+        else:
+            print(f"  {scale}: no baseline, pass --update-baseline to store one")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print("Performance regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
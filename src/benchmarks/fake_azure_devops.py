@@ -0,0 +1,593 @@
+"""Local stand-in for the Azure DevOps test REST endpoints, serving a synthetic organization.
+
+Run from the src directory:
+
+    python -m benchmarks.fake_azure_devops --plans 10 --suites 20 --cases 50 --port 8080 [--latency 0.05] [--throttle-rate 0.01]
+
+then extract from it with API_MODE=raw and ORGANIZATION_URL set to the printed URL.
+"""
+import argparse
+import gzip
+import http.server
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from utils.json_utils import get_serializer
+
+# Distinct testers, owners and run authors referenced across the organization
+IDENTITY_COUNT = 200
+OUTCOMES = ["Passed"] * 15 + ["Failed"] * 3 + ["Blocked", "NotApplicable"]
+OPERATING_SYSTEMS = ["Windows 11", "Ubuntu 22.04", "macOS 14", "Android 14", "iOS 17"]
+BROWSERS = ["Edge", "Chrome", "Firefox", "Safari"]
+
+class OrganizationShape(NamedTuple):
+    """Size of a synthetic organization: N plans x M suites x K test cases, run against C configurations"""
+    plans: int = 10
+    suites_per_plan: int = 20
+    cases_per_suite: int = 50
+    steps_per_case: int = 5
+    configurations: int = 2
+    # Every run of a plan has one result per test point of the plan
+    runs_per_plan: int = 5
+    variables: int = 3
+
+    @property
+    def points_per_plan(self) -> int:
+        return self.suites_per_plan * self.cases_per_suite * self.configurations
+
+    def counts(self) -> Dict[str, int]:
+        """Entity counts an extraction of the organization yields"""
+        return {
+            "test_plans": self.plans,
+            "test_suites": self.plans * self.suites_per_plan,
+            "test_cases": self.plans * self.suites_per_plan * self.cases_per_suite,
+            "test_points": self.plans * self.points_per_plan,
+            "test_results": self.plans * self.runs_per_plan * self.points_per_plan,
+            "test_configurations": self.configurations,
+            "test_variables": self.variables,
+        }
+
+def _identity(index: int) -> Dict[str, Any]:
+    index %= IDENTITY_COUNT
+    identity_id = f"00000000-0000-0000-0000-{index:012d}"
+    return {
+        "displayName": f"Tester {index}",
+        "url": f"https://spsprodweu5.vssps.visualstudio.com/_apis/Identities/{identity_id}",
+        "id": identity_id,
+        "uniqueName": f"tester{index}@example.com",
+        "imageUrl": f"https://dev.azure.com/fakeorg/_api/_common/identityImage?id={identity_id}",
+        "descriptor": f"aad.{identity_id.replace('-', '')}"
+    }
+
+def _date(day: int, seconds: int = 0) -> str:
+    return f"2024-{1 + day // 28 % 12:02d}-{1 + day % 28:02d}T{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.{seconds % 1000:03d}Z"
+
+class SyntheticOrganization:
+    """Deterministic REST payloads of a synthetic organization, generated on request so any size fits in memory
+
+    Payloads carry the fields Azure DevOps returns, not only the ones the extractor reads,
+    so response sizes and parsing costs are realistic.
+    """
+
+    def __init__(self, shape: OrganizationShape, project: str = "Migration"):
+        self.shape = shape
+        self.project = {"id": "11111111-2222-3333-4444-555555555555", "name": project, "state": "wellFormed"}
+
+    # Identifiers are computed from positions, so every endpoint agrees without shared state
+    def plan_id(self, plan: int) -> int:
+        return 1 + plan
+
+    def suite_id(self, plan: int, suite: int) -> int:
+        return 100000 + plan * self.shape.suites_per_plan + suite
+
+    def case_id(self, plan: int, suite: int, case: int) -> int:
+        return 1000000 + (plan * self.shape.suites_per_plan + suite) * self.shape.cases_per_suite + case
+
+    def point_id(self, plan: int, suite: int, case: int, configuration: int) -> int:
+        return 1 + ((plan * self.shape.suites_per_plan + suite) * self.shape.cases_per_suite + case) * self.shape.configurations + configuration
+
+    def run_id(self, plan: int, run: int) -> int:
+        return 1 + plan * self.shape.runs_per_plan + run
+
+    def plan_index(self, plan_id: int) -> Optional[int]:
+        plan = plan_id - 1
+        return plan if 0 <= plan < self.shape.plans else None
+
+    def suite_index(self, plan: int, suite_id: int) -> Optional[int]:
+        suite = suite_id - self.suite_id(plan, 0)
+        return suite if 0 <= suite < self.shape.suites_per_plan else None
+
+    def run_index(self, run_id: int) -> Optional[Tuple[int, int]]:
+        plan, run = divmod(run_id - 1, self.shape.runs_per_plan)
+        return (plan, run) if run_id >= 1 and plan < self.shape.plans else None
+
+    def _outcome(self, run_id: int, position: int) -> str:
+        return OUTCOMES[(run_id * 31 + position * 7) % len(OUTCOMES)]
+
+    def _configuration_name(self, configuration: int) -> str:
+        return f"{OPERATING_SYSTEMS[configuration % len(OPERATING_SYSTEMS)]} - {BROWSERS[configuration // len(OPERATING_SYSTEMS) % len(BROWSERS)]}"
+
+    def plans(self) -> List[Dict]:
+        return [self._plan(plan) for plan in range(self.shape.plans)]
+
+    def _plan(self, plan: int) -> Dict:
+        plan_id = self.plan_id(plan)
+        return {
+            "id": plan_id,
+            "name": f"Release {plan_id} regression",
+            "areaPath": f"{self.project['name']}\\Team {plan % 4}",
+            "iteration": f"{self.project['name']}\\Sprint {plan_id}",
+            "description": f"Regression test plan of release {plan_id}",
+            "startDate": _date(plan),
+            "endDate": _date(plan + 14),
+            "state": "Active",
+            "owner": _identity(plan),
+            "revision": 3,
+            "updatedDate": _date(plan + 1, plan_id),
+            "updatedBy": _identity(plan + 1),
+            "project": self.project,
+            "rootSuite": {"id": self.suite_id(plan, 0), "name": f"Release {plan_id} regression"},
+            "testOutcomeSettings": {"syncOutcomeAcrossSuites": False},
+            "_links": {"self": {"href": f"https://dev.azure.com/fakeorg/_apis/testplan/Plans/{plan_id}"}}
+        }
+
+    def suites(self, plan: int) -> List[Dict]:
+        plan_id = self.plan_id(plan)
+        suites = []
+        for suite in range(self.shape.suites_per_plan):
+            suite_id = self.suite_id(plan, suite)
+            payload = {
+                "id": suite_id,
+                "name": f"Feature area {suite}" if suite else f"Release {plan_id} regression",
+                "plan": {"id": plan_id, "name": f"Release {plan_id} regression"},
+                "project": self.project,
+                "suiteType": "staticTestSuite",
+                "inheritDefaultConfigurations": True,
+                "defaultConfigurations": [
+                    {"id": 1 + configuration, "name": self._configuration_name(configuration)}
+                    for configuration in range(self.shape.configurations)
+                ],
+                "state": "inProgress",
+                "hasChildren": suite == 0 and self.shape.suites_per_plan > 1,
+                "revision": 2,
+                "lastUpdatedBy": _identity(suite),
+                "lastUpdatedDate": _date(plan + 2, suite_id)
+            }
+            if suite:
+                payload["parentSuite"] = {"id": self.suite_id(plan, 0), "name": f"Release {plan_id} regression"}
+            suites.append(payload)
+        return suites
+
+    def test_cases(self, plan: int, suite: int) -> List[Dict]:
+        plan_id, suite_id = self.plan_id(plan), self.suite_id(plan, suite)
+        cases = []
+        for case in range(self.shape.cases_per_suite):
+            case_id = self.case_id(plan, suite, case)
+            cases.append({
+                "testPlan": {"id": plan_id, "name": f"Release {plan_id} regression"},
+                "project": self.project,
+                "testSuite": {"id": suite_id, "name": f"Feature area {suite}"},
+                "workItem": {
+                    "id": case_id,
+                    "name": f"Verify scenario {case} of feature area {suite}",
+                    "workItemFields": [
+                        {"System.Rev": 1 + case % 5},
+                        {"System.Description": f"<div>Checks scenario {case} end to end, from a clean profile.</div>"},
+                        {"Microsoft.VSTS.Common.Priority": 1 + case % 4},
+                        {"Microsoft.VSTS.TCM.Steps": self._steps_xml(case_id)}
+                    ]
+                },
+                "pointAssignments": [
+                    {
+                        "id": self.point_id(plan, suite, case, configuration),
+                        "configurationId": 1 + configuration,
+                        "configurationName": self._configuration_name(configuration),
+                        "tester": _identity(case_id)
+                    }
+                    for configuration in range(self.shape.configurations)
+                ],
+                "order": case,
+                "links": {"testPoints": {"href": f"https://dev.azure.com/fakeorg/_apis/testplan/Plans/{plan_id}/Suites/{suite_id}/TestPoint?testCaseId={case_id}"}}
+            })
+        return cases
+
+    def _steps_xml(self, case_id: int) -> str:
+        steps = "".join(
+            f'<step id="{step}" type="{"ValidateStep" if step % 2 else "ActionStep"}">'
+            f'<parameterizedString isformatted="true">&lt;DIV&gt;&lt;P&gt;Open the screen of step {step} and enter the values of case {case_id}&lt;/P&gt;&lt;/DIV&gt;</parameterizedString>'
+            f'<parameterizedString isformatted="true">&lt;DIV&gt;&lt;P&gt;The screen shows the expected values&lt;/P&gt;&lt;/DIV&gt;</parameterizedString>'
+            f'<description/></step>'
+            for step in range(2, 2 + self.shape.steps_per_case)
+        )
+        return f'<steps id="0" last="{1 + self.shape.steps_per_case}">{steps}</steps>'
+
+    def points(self, plan: int, suite: int) -> List[Dict]:
+        plan_id, suite_id = self.plan_id(plan), self.suite_id(plan, suite)
+        last_run_id = self.run_id(plan, self.shape.runs_per_plan - 1)
+        points = []
+        for case in range(self.shape.cases_per_suite):
+            case_id = self.case_id(plan, suite, case)
+            for configuration in range(self.shape.configurations):
+                position = (suite * self.shape.cases_per_suite + case) * self.shape.configurations + configuration
+                # Points carry the outcome of their result in the last run
+                outcome = self._outcome(last_run_id, position).lower() if self.shape.runs_per_plan else "unspecified"
+                points.append({
+                    "id": self.point_id(plan, suite, case, configuration),
+                    "testPlan": {"id": plan_id, "name": f"Release {plan_id} regression"},
+                    "testSuite": {"id": suite_id, "name": f"Feature area {suite}"},
+                    "configuration": {"id": 1 + configuration, "name": self._configuration_name(configuration)},
+                    "project": self.project,
+                    "testCaseReference": {"id": case_id, "name": f"Verify scenario {case} of feature area {suite}", "state": "Ready"},
+                    "tester": _identity(case_id),
+                    "results": {
+                        "outcome": outcome,
+                        "state": "completed" if self.shape.runs_per_plan else "ready",
+                        "lastResultId": 100000 + position,
+                        "lastResultDetails": {"dateCompleted": _date(plan + 3, position), "duration": 5000 + position % 60000, "runBy": _identity(position)},
+                        "lastRunBuildNumber": f"{plan_id}.0.{self.shape.runs_per_plan}"
+                    },
+                    "isActive": True,
+                    "isAutomated": False,
+                    "lastUpdatedDate": _date(plan + 3, position),
+                    "lastUpdatedBy": _identity(position),
+                    "lastResetToActive": _date(plan, position)
+                })
+        return points
+
+    def configurations(self) -> List[Dict]:
+        return [
+            {
+                "id": 1 + configuration,
+                "name": self._configuration_name(configuration),
+                "description": f"Runs on {self._configuration_name(configuration)}",
+                "state": "active",
+                "isDefault": configuration == 0,
+                "values": [
+                    {"name": "Operating System", "value": OPERATING_SYSTEMS[configuration % len(OPERATING_SYSTEMS)]},
+                    {"name": "Browser", "value": BROWSERS[configuration // len(OPERATING_SYSTEMS) % len(BROWSERS)]}
+                ],
+                "project": self.project
+            }
+            for configuration in range(self.shape.configurations)
+        ]
+
+    def variables(self) -> List[Dict]:
+        names = ["Operating System", "Browser", "Locale", "Screen size", "Network"]
+        return [
+            {
+                "id": 1 + variable,
+                "name": names[variable % len(names)] + (f" {variable // len(names)}" if variable >= len(names) else ""),
+                "description": f"Test variable {variable}",
+                "values": [f"value {value}" for value in range(4)],
+                "project": self.project
+            }
+            for variable in range(self.shape.variables)
+        ]
+
+    def runs(self, plan: int) -> List[Dict]:
+        plan_id = self.plan_id(plan)
+        runs = []
+        for run in range(self.shape.runs_per_plan):
+            run_id = self.run_id(plan, run)
+            runs.append({
+                "id": run_id,
+                "name": f"Release {plan_id} regression run {run + 1}",
+                "url": f"https://dev.azure.com/fakeorg/{self.project['name']}/_apis/test/Runs/{run_id}",
+                "isAutomated": False,
+                "iteration": f"{self.project['name']}\\Sprint {plan_id}",
+                "owner": _identity(run_id),
+                "project": self.project,
+                "plan": {"id": str(plan_id)},
+                "startedDate": _date(plan + 3, run_id),
+                "completedDate": _date(plan + 3, run_id + 3600),
+                "state": "Completed",
+                "totalTests": self.shape.points_per_plan,
+                "incompleteTests": 0,
+                "notApplicableTests": 0,
+                "passedTests": self.shape.points_per_plan * 3 // 4,
+                "unanalyzedTests": 0,
+                "revision": 4,
+                "lastUpdatedDate": _date(plan + 3, run_id + 3600),
+                "lastUpdatedBy": _identity(run_id),
+                "webAccessUrl": f"https://dev.azure.com/fakeorg/{self.project['name']}/_TestManagement/Runs?runId={run_id}"
+            })
+        return runs
+
+    def results(self, plan: int, run: int, skip: int, top: int) -> List[Dict]:
+        plan_id, run_id = self.plan_id(plan), self.run_id(plan, run)
+        shape = self.shape
+        results = []
+        for position in range(skip, min(skip + top, shape.points_per_plan)):
+            suite, rest = divmod(position, shape.cases_per_suite * shape.configurations)
+            case, configuration = divmod(rest, shape.configurations)
+            case_id = self.case_id(plan, suite, case)
+            outcome = self._outcome(run_id, position)
+            results.append({
+                "id": 100000 + position,
+                "project": self.project,
+                "startedDate": _date(plan + 3, run_id + position),
+                "completedDate": _date(plan + 3, run_id + position + 5),
+                "durationInMs": float(5000 + position % 60000),
+                "outcome": outcome,
+                "revision": 1,
+                "runBy": _identity(position),
+                "state": "Completed",
+                "testCase": {"id": str(case_id), "name": f"Verify scenario {case} of feature area {suite}"},
+                "testPoint": {"id": str(self.point_id(plan, suite, case, configuration))},
+                "testRun": {"id": str(run_id), "name": f"Release {plan_id} regression run {run + 1}"},
+                "testPlan": {"id": str(plan_id), "name": f"Release {plan_id} regression"},
+                "testSuite": {"id": str(self.suite_id(plan, suite)), "name": f"Feature area {suite}"},
+                "configuration": {"id": str(1 + configuration), "name": self._configuration_name(configuration)},
+                "lastUpdatedDate": _date(plan + 3, run_id + position + 5),
+                "lastUpdatedBy": _identity(position),
+                "priority": 1 + case % 4,
+                "computerName": f"TESTVM{position % 16:02d}",
+                "owner": _identity(case_id),
+                "testCaseTitle": f"Verify scenario {case} of feature area {suite}",
+                "testCaseRevision": 1 + case % 5,
+                "failureType": "None" if outcome != "Failed" else "Regression",
+                "errorMessage": f"Step {2 + position % max(1, shape.steps_per_case)} showed unexpected values" if outcome == "Failed" else None,
+                "comment": None,
+                "createdDate": _date(plan + 3, run_id),
+                "url": f"https://dev.azure.com/fakeorg/{self.project['name']}/_apis/test/Runs/{run_id}/Results/{100000 + position}"
+            })
+        return results
+
+class FakeAzureDevOpsServer:
+    """HTTP server answering the test REST endpoints of AzureRestClient from a synthetic organization
+
+    Responses can be delayed to simulate network latency and randomly answered with 429 and the
+    Azure DevOps rate limiting headers, to exercise the rate limiter and retry policy.
+    """
+
+    # Items per page of the endpoints paged with continuation tokens
+    PAGE_SIZE = 200
+
+    def __init__(
+        self,
+        organization: SyntheticOrganization,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0
+    ):
+        self.organization = organization
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._serializer = get_serializer("auto", compact=True)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "throttled": 0, "not_found": 0, "not_modified": 0, "bytes_sent": 0, "endpoints": {}}
+        self._routes: List[Tuple[str, "re.Pattern", Callable[..., Tuple[List[Dict], bool]]]] = [
+            ("test_plans", re.compile(r"testplan/plans"), self._plans),
+            ("test_suites", re.compile(r"testplan/plans/(\d+)/suites"), self._suites),
+            ("test_cases", re.compile(r"testplan/plans/(\d+)/suites/(\d+)/testcase"), self._test_cases),
+            ("test_points", re.compile(r"testplan/plans/(\d+)/suites/(\d+)/testpoint"), self._points),
+            ("test_configurations", re.compile(r"testplan/configurations"), self._configurations),
+            ("test_variables", re.compile(r"testplan/variables"), self._variables),
+            ("test_runs", re.compile(r"test/runs"), self._runs),
+            ("test_results", re.compile(r"test/runs/(\d+)/results"), self._results),
+        ]
+        self._server = http.server.ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def organization_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/fakeorg"
+
+    def start(self) -> str:
+        """Serve on a background thread and return the organization URL to extract from"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-azure-devops", daemon=True)
+        self._thread.start()
+        return self.organization_url
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted"""
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeAzureDevOpsServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests served, per endpoint, and the responses throttled or not modified"""
+        with self._lock:
+            return dict(self._stats, endpoints=dict(self._stats["endpoints"]))
+
+    def handle(self, path: str, query: Dict[str, List[str]], accept_encoding: str, if_none_match: str = "") -> Tuple[int, Dict[str, str], bytes]:
+        """Status, headers and body of the response to a GET request"""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0)
+            throttled = self.throttle_rate > 0 and self._random.random() < self.throttle_rate
+        if delay:
+            time.sleep(delay)
+
+        route = path.split("/_apis/", 1)[-1].rstrip("/").lower()
+        for endpoint, pattern, serve in self._routes:
+            match = pattern.fullmatch(route)
+            if match:
+                break
+        else:
+            endpoint, match = None, None
+
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        if throttled:
+            # Rejected before being processed, as Azure DevOps does once the TSTU budget is spent
+            status = 429
+            headers.update({
+                "Retry-After": f"{self.retry_after:g}",
+                "X-RateLimit-Resource": "ATCPU",
+                "X-RateLimit-Delay": f"{self.retry_after:g}",
+                "X-RateLimit-Limit": "200",
+                "X-RateLimit-Remaining": "0"
+            })
+            body = self._serializer.dumps({"message": "Request was blocked due to exceeding usage of resource 'ATCPU'."})
+        else:
+            page = serve(query, *map(int, match.groups())) if match else None
+            if page is None:
+                status = 404
+                body = self._serializer.dumps({"message": f"No resource found at {path}"})
+            else:
+                status = 200
+                items, continuation_token = page
+                if continuation_token:
+                    headers["x-ms-continuationtoken"] = continuation_token
+                body = self._serializer.dumps({"count": len(items), "value": items})
+                # Payloads are deterministic, so a conditional request for unchanged data gets a 304
+                headers["ETag"] = f'"{zlib.crc32(body):08x}"'
+                if if_none_match == headers["ETag"]:
+                    status, body = 304, b""
+        if body and "gzip" in accept_encoding:
+            # Fast level: the server shares the CPU with the extraction it serves
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["throttled"] += throttled
+            self._stats["not_found"] += status == 404
+            self._stats["not_modified"] += status == 304
+            self._stats["bytes_sent"] += len(body)
+            if endpoint and not throttled:
+                self._stats["endpoints"][endpoint] = self._stats["endpoints"].get(endpoint, 0) + 1
+        return status, headers, body
+
+    def _handler_class(self) -> type:
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            # Keep-alive, like Azure DevOps, so the connection pool is exercised
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, headers, body = fake.handle(
+                    url.path, parse_qs(url.query), self.headers.get("Accept-Encoding", ""), self.headers.get("If-None-Match", "")
+                )
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_HEAD(self):
+                # Answered like the organization root, for connection pre-warming
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    # Endpoint handlers return a page of items and the continuation token of the next one,
+    # or None for identifiers outside the organization
+    def _paged(self, items: List[Dict], query: Dict[str, List[str]]) -> Tuple[List[Dict], Optional[str]]:
+        start = int(query.get("continuationToken", ["0"])[0])
+        end = start + self.PAGE_SIZE
+        return items[start:end], str(end) if end < len(items) else None
+
+    def _plans(self, query):
+        return self._paged(self.organization.plans(), query)
+
+    def _suites(self, query, plan_id):
+        plan = self.organization.plan_index(plan_id)
+        return None if plan is None else self._paged(self.organization.suites(plan), query)
+
+    def _test_cases(self, query, plan_id, suite_id):
+        plan = self.organization.plan_index(plan_id)
+        suite = None if plan is None else self.organization.suite_index(plan, suite_id)
+        return None if suite is None else self._paged(self.organization.test_cases(plan, suite), query)
+
+    def _points(self, query, plan_id, suite_id):
+        plan = self.organization.plan_index(plan_id)
+        suite = None if plan is None else self.organization.suite_index(plan, suite_id)
+        return None if suite is None else self._paged(self.organization.points(plan, suite), query)
+
+    def _configurations(self, query):
+        return self._paged(self.organization.configurations(), query)
+
+    def _variables(self, query):
+        return self._paged(self.organization.variables(), query)
+
+    def _runs(self, query):
+        plan = self.organization.plan_index(int(query.get("planId", ["0"])[0]))
+        runs = [] if plan is None else self.organization.runs(plan)
+        skip, top = self._skip_top(query, len(runs))
+        return runs[skip:skip + top], None
+
+    def _results(self, query, run_id):
+        run = self.organization.run_index(run_id)
+        if run is None:
+            return None
+        skip, top = self._skip_top(query, self.organization.shape.points_per_plan)
+        return self.organization.results(*run, skip, top), None
+
+    @staticmethod
+    def _skip_top(query: Dict[str, List[str]], total: int) -> Tuple[int, int]:
+        return int(query.get("$skip", ["0"])[0]), int(query.get("$top", [str(total)])[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic Azure DevOps organization for offline extraction runs")
+    parser.add_argument("--plans", type=int, default=10, help="Number of test plans")
+    parser.add_argument("--suites", type=int, default=20, help="Test suites per plan")
+    parser.add_argument("--cases", type=int, default=50, help="Test cases per suite")
+    parser.add_argument("--steps", type=int, default=5, help="Steps per test case")
+    parser.add_argument("--configurations", type=int, default=2, help="Configurations every test case is planned against")
+    parser.add_argument("--runs", type=int, default=5, help="Test runs per plan, each with a result per test point")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every response is delayed by")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Upper bound in seconds of a random extra delay")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds of throttled responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    shape = OrganizationShape(
+        plans=args.plans,
+        suites_per_plan=args.suites,
+        cases_per_suite=args.cases,
+        steps_per_case=args.steps,
+        configurations=args.configurations,
+        runs_per_plan=args.runs
+    )
+    server = FakeAzureDevOpsServer(
+        SyntheticOrganization(shape),
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        host=args.host,
+        port=args.port
+    )
+    print(f"Serving {shape.counts()} at {server.organization_url}")
+    print(f"  ORGANIZATION_URL={server.organization_url} PROJECT_NAME=Migration API_MODE=raw")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
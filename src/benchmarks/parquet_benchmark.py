@@ -0,0 +1,62 @@
+"""Cost of outcome statistics over test results read from JSON and from the Parquet export.
+
+Run from the src directory:
+
+    python -m benchmarks.parquet_benchmark --entities 500000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Dict
+import pyarrow.parquet
+from benchmarks.sqlite_store_benchmark import make_results
+from storage.parquet_writer import ParquetWriter
+from utils.json_utils import get_serializer
+
+def main():
+    parser = argparse.ArgumentParser(description="Outcome statistics read from JSON and Parquet")
+    parser.add_argument("--entities", type=int, default=500000, help="Number of synthetic test results")
+    args = parser.parse_args()
+
+    results = make_results(args.entities)
+    timings: Dict[str, float] = {}
+    sizes: Dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "test_results.json")
+        started = time.perf_counter()
+        with open(json_path, "wb") as f:
+            get_serializer("auto").dump(results, f)
+        timings["JSON write"] = time.perf_counter() - started
+        sizes["JSON"] = os.path.getsize(json_path)
+
+        started = time.perf_counter()
+        writer = ParquetWriter(directory, "test_results")
+        writer.write_many(results)
+        writer.close()
+        timings["Parquet write"] = time.perf_counter() - started
+        sizes["Parquet"] = os.path.getsize(writer.path)
+
+        # Outcome counts per configuration, the typical migration sizing query
+        started = time.perf_counter()
+        with open(json_path, "rb") as f:
+            json_counts = Counter((result["configuration_id"], result["outcome"]) for result in json.load(f))
+        timings["JSON load and count"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        # Every row group has its own dictionary
+        table = pyarrow.parquet.read_table(writer.path, columns=["configuration_id", "outcome"]).unify_dictionaries()
+        grouped = table.group_by(["configuration_id", "outcome"]).aggregate([([], "count_all")])
+        timings["Parquet read 2 columns and count"] = time.perf_counter() - started
+
+    print(f"{args.entities} test results, {len(json_counts)} configuration and outcome groups in JSON, {grouped.num_rows} in Parquet")
+    for name, size in sizes.items():
+        print(f"  {name + ' size':<36} {size / 2 ** 20:10.1f} MB")
+    for name, seconds in timings.items():
+        print(f"  {name:<36} {seconds * 1000:10.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Microbenchmark of the per-entity cost of converting test results into extraction records.
+
+Run from the src directory:
+
+    python -m benchmarks.projector_benchmark --entities 20000
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Optional
+from msrest import Deserializer
+from azure.devops.v7_1.test import models
+from extractors.projectors import SDK_PROJECTORS, JSON_PROJECTORS
+
+def make_payload(count: int) -> List[Dict]:
+    """Build REST JSON test results shaped like the Azure DevOps responses"""
+    return [{
+        "id": 100000 + i,
+        "testPlan": {"id": str(i // 5000)},
+        "testPoint": {"id": str(i // 3)},
+        "testCase": {"id": str(1000 + i % 400)},
+        "testRun": {"id": str(i // 200)},
+        "configuration": {"id": "1", "name": "Windows"},
+        "outcome": "Passed" if i % 7 else "Failed",
+        "errorMessage": None if i % 7 else "Assertion failed",
+        "comment": None,
+        "state": "Completed",
+        "completedDate": "2024-03-01T12:00:00.123Z",
+        "durationInMs": 1250.0,
+        "startedDate": "2024-03-01T11:59:58.873Z",
+        "runBy": {
+            "id": f"00000000-0000-0000-0000-{i % 40:012d}",
+            "displayName": f"Tester {i % 40}",
+            "uniqueName": f"tester{i % 40}@example.com",
+            "url": "https://dev.azure.com/org/_apis/Identities/0"
+        }
+    } for i in range(count)]
+
+def legacy_identity_ref(identity_ref: Any) -> Optional[Dict]:
+    """hasattr-chain conversion used before the projectors, kept as the reference point"""
+    if not identity_ref:
+        return None
+
+    return {
+        "id": identity_ref.id if hasattr(identity_ref, 'id') else None,
+        "display_name": identity_ref.display_name if hasattr(identity_ref, 'display_name') else None,
+        "unique_name": identity_ref.unique_name if hasattr(identity_ref, 'unique_name') else None,
+        "url": identity_ref.url if hasattr(identity_ref, 'url') else None,
+    }
+
+def legacy_test_result(result: Any, point_id: int) -> Dict:
+    """hasattr-chain conversion used before the projectors, kept as the reference point"""
+    return {
+        "id": result.id,
+        "test_plan_id": result.test_plan.id if hasattr(result, 'test_plan') and result.test_plan else None,
+        "test_point_id": point_id,
+        "test_case_id": result.test_case.id if hasattr(result, 'test_case') and result.test_case else None,
+        "test_run_id": result.test_run.id if hasattr(result, 'test_run') and result.test_run else None,
+        "configuration_id": result.configuration.id if hasattr(result, 'configuration') and result.configuration else None,
+        "outcome": result.outcome if hasattr(result, 'outcome') else None,
+        "error_message": result.error_message if hasattr(result, 'error_message') else None,
+        "comment": result.comment if hasattr(result, 'comment') else None,
+        "state": result.state if hasattr(result, 'state') else None,
+        "completed_date": result.completed_date if hasattr(result, 'completed_date') else None,
+        "duration_in_ms": result.duration_in_ms if hasattr(result, 'duration_in_ms') else None,
+        "started_date": result.started_date if hasattr(result, 'started_date') else None,
+        "run_by": legacy_identity_ref(result.run_by) if hasattr(result, 'run_by') and result.run_by else None,
+        "attachments": result.attachments if hasattr(result, 'attachments') else None,
+    }
+
+def measure(convert: Callable[[], Any], count: int, repeat: int) -> float:
+    """Best per-entity time in microseconds over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        convert()
+        best = min(best, time.perf_counter() - started)
+    return best / count * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-entity conversion cost of test results")
+    parser.add_argument("--entities", type=int, default=20000, help="Number of test results converted per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs; the fastest one is reported")
+    args = parser.parse_args()
+
+    payload = make_payload(args.entities)
+    deserializer = Deserializer({name: model for name, model in vars(models).items() if isinstance(model, type)})
+    sdk_results = deserializer("[TestCaseResult]", payload)
+    project_sdk = SDK_PROJECTORS["test_result"]
+    project_json = JSON_PROJECTORS["test_result"]
+
+    timings = {
+        "msrest deserialization (SDK mode only)": measure(lambda: deserializer("[TestCaseResult]", payload), args.entities, args.repeat),
+        "hasattr chains (before)": measure(lambda: [legacy_test_result(result, 1) for result in sdk_results], args.entities, args.repeat),
+        "compiled projector, SDK models": measure(lambda: [project_sdk(result, test_point_id=1) for result in sdk_results], args.entities, args.repeat),
+        "compiled projector, REST JSON": measure(lambda: [project_json(result, test_point_id=1) for result in payload], args.entities, args.repeat),
+    }
+
+    print(f"Test result conversion, {args.entities} entities, best of {args.repeat}")
+    for name, microseconds in timings.items():
+        print(f"  {name:<40} {microseconds:8.2f} us/entity")
+
+if __name__ == "__main__":
+    main()
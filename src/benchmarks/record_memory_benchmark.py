@@ -0,0 +1,70 @@
+"""Memory benchmark of holding extracted test results as slotted records or as dicts.
+
+Run from the src directory:
+
+    python -m benchmarks.record_memory_benchmark --entities 1000000
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, Dict, Iterator, List
+from extractors.identities import IdentityTable
+from extractors.projectors import JSON_PROJECTORS, compile_projectors
+
+def iter_payload(count: int) -> Iterator[Dict]:
+    """Yield REST JSON test results one at a time, so only the converted entities stay in memory"""
+    for i in range(count):
+        yield {
+            "id": 100000 + i,
+            "testPlan": {"id": str(i // 50000)},
+            "testPoint": {"id": str(i // 3)},
+            "testCase": {"id": str(1000 + i % 4000)},
+            "testRun": {"id": str(i // 2000)},
+            "configuration": {"id": "1", "name": "Windows"},
+            "outcome": "Passed" if i % 7 else "Failed",
+            "errorMessage": None if i % 7 else f"Assertion failed in step {i % 11}",
+            "comment": None,
+            "state": "Completed",
+            "completedDate": f"2024-03-{1 + i % 28:02d}T12:00:00.123Z",
+            "durationInMs": float(i % 5000),
+            "startedDate": f"2024-03-{1 + i % 28:02d}T11:59:58.873Z",
+            "runBy": {
+                "id": f"00000000-0000-0000-0000-{i % 200:012d}",
+                "displayName": f"Tester {i % 200}",
+                "uniqueName": f"tester{i % 200}@example.com",
+                "url": "https://dev.azure.com/org/_apis/Identities/0"
+            }
+        }
+
+def measure(build: Callable[[], List], count: int) -> Dict[str, float]:
+    """Memory retained by the built entities; tracing makes building them several times slower"""
+    gc.collect()
+    tracemalloc.start()
+    entities = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entities
+    return {"mb": retained / 2 ** 20, "bytes_per_entity": retained / count}
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory held by extracted test results")
+    parser.add_argument("--entities", type=int, default=1000000, help="Number of synthetic test results")
+    args = parser.parse_args()
+
+    # Identities are interned by ID, as in a default extraction
+    identities = IdentityTable(JSON_PROJECTORS["identity_ref"], by_id=True)
+    project = compile_projectors("json", {"identity_ref": identities.reference})["test_result"]
+
+    def build_records() -> List:
+        return [project(result, test_point_id=i // 3) for i, result in enumerate(iter_payload(args.entities))]
+
+    def build_dicts() -> List:
+        return [project(result, test_point_id=i // 3).to_dict() for i, result in enumerate(iter_payload(args.entities))]
+
+    print(f"Test results held in memory, {args.entities} synthetic entities")
+    for name, build in (("dicts", build_dicts), ("slotted records", build_records)):
+        stats = measure(build, args.entities)
+        print(f"  {name:<16} {stats['mb']:9.1f} MB  {stats['bytes_per_entity']:7.1f} bytes/entity")
+
+if __name__ == "__main__":
+    main()
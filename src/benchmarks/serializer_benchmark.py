@@ -0,0 +1,91 @@
+"""Write throughput of the JSON backends when saving extracted test results.
+
+Run from the src directory:
+
+    python -m benchmarks.serializer_benchmark --entities 200000 [--compression gzip]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+from benchmarks.record_memory_benchmark import iter_payload
+from extractors.identities import IdentityTable
+from extractors.projectors import JSON_PROJECTORS, compile_projectors
+from storage.compression import CompressedFile, WriteStats, get_codec
+from storage.records import json_default
+from utils.json_utils import SERIALIZERS, get_serializer, orjson
+
+def make_results(count: int) -> List:
+    """Test result records as the SDK mode holds them, with datetime dates and identities interned by ID"""
+    identities = IdentityTable(JSON_PROJECTORS["identity_ref"], by_id=True)
+    project = compile_projectors("json", {"identity_ref": identities.reference})["test_result"]
+    results = []
+    for i, payload in enumerate(iter_payload(count)):
+        result = project(payload, test_point_id=i // 3)
+        result.completed_date = datetime.fromisoformat(result.completed_date)
+        result.started_date = datetime.fromisoformat(result.started_date)
+        results.append(result)
+    return results
+
+def measure(write: Callable[[str], int], path: str, repeat: int) -> Dict[str, float]:
+    """Best write throughput over several runs, file open and close included, in serialized MB per second"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        raw_bytes = write(path)
+        best = min(best, time.perf_counter() - started)
+    return {
+        "mb": raw_bytes / 2 ** 20,
+        "ratio": raw_bytes / os.path.getsize(path),
+        "seconds": best,
+        "mb_per_second": raw_bytes / 2 ** 20 / best
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Write throughput of the JSON backends")
+    parser.add_argument("--entities", type=int, default=200000, help="Number of synthetic test results written")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs; the fastest one is reported")
+    parser.add_argument("--compression", choices=["none", "gzip", "zstd"], default="none", help="Compression of the written files")
+    args = parser.parse_args()
+    codec = get_codec(args.compression)
+
+    results = make_results(args.entities)
+
+    def write_before(path: str) -> int:
+        # Former save path: json.dump with indentation, which bypasses the C encoder
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=json_default)
+        return os.path.getsize(path)
+
+    def write_with(serializer) -> Callable[[str], int]:
+        def write(path: str) -> int:
+            stats = WriteStats(codec)
+            with CompressedFile(path, "wb", codec, stats) as f:
+                serializer.dump(results, f)
+            return stats.raw_bytes
+        return write
+
+    # The former save path never compressed
+    writers = {} if codec else {"json.dump, indent=2 (before)": write_before}
+    for backend in SERIALIZERS:
+        if backend == "orjson" and orjson is None:
+            print("orjson is not installed, skipping its backend")
+            continue
+        for compact in (False, True):
+            writers[f"{backend}{', compact' if compact else ''}"] = write_with(get_serializer(backend, compact=compact))
+
+    print(f"Writing {args.entities} test results, compression {args.compression}, best of {args.repeat}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "test_results.json")
+        for name, write in writers.items():
+            stats = measure(write, path, args.repeat)
+            print(
+                f"  {name:<30} {stats['mb']:8.1f} MB  ratio {stats['ratio']:5.1f}  "
+                f"{stats['seconds']:7.2f} s  {stats['mb_per_second']:8.1f} MB/s"
+            )
+
+if __name__ == "__main__":
+    main()
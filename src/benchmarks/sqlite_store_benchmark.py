@@ -0,0 +1,78 @@
+"""Lookup cost of "all results of test case X under configuration Y" in JSON files and in the SQLite store.
+
+Run from the src directory:
+
+    python -m benchmarks.sqlite_store_benchmark --entities 200000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List
+from benchmarks.record_memory_benchmark import iter_payload
+from extractors.identities import IdentityTable
+from extractors.projectors import JSON_PROJECTORS, compile_projectors
+from storage.sqlite_store import SqliteStore
+from utils.json_utils import get_serializer
+
+def make_results(count: int) -> List:
+    """Test results spread over 4000 test cases and 5 configurations"""
+    identities = IdentityTable(JSON_PROJECTORS["identity_ref"], by_id=True)
+    project = compile_projectors("json", {"identity_ref": identities.reference})["test_result"]
+    results = []
+    for i, payload in enumerate(iter_payload(count)):
+        payload["configuration"] = {"id": str(1 + i % 5)}
+        results.append(project(payload, test_point_id=i // 3))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed SQLite lookups against JSON scans")
+    parser.add_argument("--entities", type=int, default=200000, help="Number of synthetic test results")
+    parser.add_argument("--lookups", type=int, default=100, help="Number of test case and configuration pairs looked up")
+    args = parser.parse_args()
+
+    results = make_results(args.entities)
+    pairs = [(1000 + i * 37 % 4000, 1 + i % 5) for i in range(args.lookups)]
+    serializer = get_serializer("auto")
+    timings: Dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "test_results.json")
+        with open(json_path, "wb") as f:
+            serializer.dump(results, f)
+
+        started = time.perf_counter()
+        store = SqliteStore(directory, serializer)
+        store.write_many("test_results", results)
+        store.close()
+        timings["SQLite store write, indexes included"] = time.perf_counter() - started
+
+        # JSON: every lookup needs the file loaded and scanned
+        started = time.perf_counter()
+        with open(json_path, "rb") as f:
+            loaded = json.load(f)
+        timings["JSON load"] = time.perf_counter() - started
+        started = time.perf_counter()
+        json_matches = sum(
+            sum(1 for result in loaded if int(result["test_case_id"]) == case_id and int(result["configuration_id"]) == configuration_id)
+            for case_id, configuration_id in pairs
+        )
+        timings[f"JSON scans, {args.lookups} lookups"] = time.perf_counter() - started
+
+        connection = sqlite3.connect(os.path.join(directory, SqliteStore.FILENAME))
+        query = "SELECT data FROM test_results WHERE test_case_id = ? AND configuration_id = ?"
+        plan = connection.execute(f"EXPLAIN QUERY PLAN {query}", pairs[0]).fetchall()
+        started = time.perf_counter()
+        sqlite_matches = sum(len([json.loads(data) for (data,) in connection.execute(query, pair)]) for pair in pairs)
+        timings[f"SQLite queries, {args.lookups} lookups"] = time.perf_counter() - started
+        connection.close()
+
+    print(f"{args.entities} test results, {json_matches} matches in JSON, {sqlite_matches} in SQLite")
+    print(f"  query plan: {plan[0][-1]}")
+    for name, seconds in timings.items():
+        print(f"  {name:<40} {seconds * 1000:10.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,38 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Literal
 
 class AzureConfig(BaseSettings):
     organization_url: str = Field(..., description="Azure DevOps organization URL")
     personal_access_token: str = Field(..., description="Azure DevOps PAT")
     project_name: str = Field(..., description="Azure DevOps project name")
+    max_concurrent_requests: int = Field(1, description="Maximum number of Azure DevOps API calls in flight at once (1 = sequential)")
+    retry_max_attempts: int = Field(5, description="Maximum attempts per Azure DevOps call, including the first one")
+    retry_base_delay: float = Field(1.0, description="Base delay in seconds of the exponential retry backoff")
+    retry_max_delay: float = Field(60.0, description="Upper bound in seconds of a single retry backoff")
+    retry_request_budget: float = Field(300.0, description="Maximum seconds spent on a single call, retries included")
+    retry_phase_budget: float = Field(3600.0, description="Seconds after entering an extraction phase (once per plan for plan phases) past which its failed calls are no longer retried")
+    http_pool_maxsize: int = Field(0, description="Maximum pooled HTTP connections per host (0 = match max_concurrent_requests)")
+    http_keep_alive: bool = Field(True, description="Keep HTTP connections open between Azure DevOps calls")
+    http_gzip: bool = Field(True, description="Ask Azure DevOps for gzip-compressed responses")
+    http_prewarm_connections: int = Field(0, description="Number of connections opened to the organization before extraction starts")
+    http_cassette_mode: Literal["off", "record", "replay"] = Field("off", description="Record every Azure DevOps response to an HTTP cassette, or replay the cassette instead of calling Azure DevOps")
+    http_cassette_path: str = Field("cassettes/extraction.ndjson.gz", description="HTTP cassette file recorded or replayed")
+    http_replay_latency: float = Field(0.0, description="Seconds every replayed response is delayed by, to simulate network latency")
+    http_cache: bool = Field(False, description="Keep Azure DevOps responses in an on-disk cache, revalidated with conditional requests")
+    http_cache_path: str = Field("cache/http_cache.db", description="SQLite file of the HTTP response cache")
+    api_mode: Literal["sdk", "raw"] = Field("sdk", description="Read entities through the SDK models or project them straight from the REST JSON payloads")
+    work_item_batch_size: int = Field(200, description="Number of test case work items fetched per batch request in SDK mode (Azure DevOps allows up to 200)")
+    results_page_size: int = Field(1000, description="Page size ($top) used when paging through test runs and their results")
+    output_format: Literal["json", "ndjson", "sqlite"] = Field("json", description="Write JSON arrays at the end of the run, or stream entities to NDJSON files or an indexed SQLite database as they are extracted")
+    sqlite_output: bool = Field(False, description="Also write the entities to an indexed SQLite database next to the JSON or NDJSON files")
+    parquet_output: bool = Field(False, description="Also write test points and test results as columnar Parquet files")
+    json_backend: Literal["json", "orjson", "auto"] = Field("json", description="JSON encoder used for output files and checkpoints (auto = orjson when installed)")
+    json_compact: bool = Field(False, description="Write JSON documents without indentation or spaces")
+    output_compression: Literal["none", "gzip", "zstd"] = Field("none", description="Compress the extracted entity files")
+    output_compression_level: int = Field(0, description="Compression level (0 = codec default: 6 for gzip, 3 for zstd)")
+    identity_references: Literal["id", "inline"] = Field("id", description="Refer to identities by ID in entities, with the records in identities.json, or embed the identity records")
+    streaming_plan_window: int = Field(4, description="Number of test plans extracted concurrently and held in memory in streaming mode")
     
     class Config:
         env_file = ".env" 
\ No newline at end of file
@@ -1,11 +1,25 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple, Iterable
 import asyncio
+import functools
 import os
-import json
+import time
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from utils.azure_client import AzureDevOpsClient
+from storage.ndjson_writer import NdjsonWriter
+from storage.sqlite_store import SqliteStore
+from storage import parquet_writer
+from storage.checkpoint import ExtractionCheckpoint
+from storage.baseline import ExtractionBaseline
+from storage.extraction_reader import read_entities
+from storage.compression import CompressedFile, WriteStats, get_codec
+from extractors import json_projections
+from extractors.projectors import SDK_PROJECTORS, JSON_PROJECTORS, compile_projectors, work_item_field_names
+from extractors.work_item_batcher import WorkItemBatcher
+from extractors.identities import IdentityTable
+from utils.json_utils import get_serializer
 from config.config import AzureConfig
+from azure.devops.released.work_item_tracking import WorkItemBatchGetRequest
 
 class AzureTestExtractor:
     def __init__(self, config: AzureConfig):
@@ -14,34 +28,97 @@ class AzureTestExtractor:
         self.output_dir = os.path.join("output", "data", "extraction")
         os.makedirs(self.output_dir, exist_ok=True)
         self.logger = logging.getLogger(__name__)
+        # Global limit on the number of API calls in flight across all plans
+        self._api_semaphore = asyncio.Semaphore(max(1, config.max_concurrent_requests))
+        # Raw mode reads the REST JSON payloads and projects them without building SDK models
+        self._raw_json = config.api_mode == "raw"
+        source_projectors = JSON_PROJECTORS if self._raw_json else SDK_PROJECTORS
+        # Every identity is converted once; entities share its record or refer to it by ID
+        self._identities = IdentityTable(source_projectors["identity_ref"], by_id=config.identity_references == "id")
+        # Field projectors compiled from the entity specs for the source being read
+        self._projectors = compile_projectors(
+            "json" if self._raw_json else "attribute",
+            {"identity_ref": self._identities.reference}
+        )
+        # Encoder of every output file and checkpoint entry
+        self._serializer = get_serializer(config.json_backend, compact=config.json_compact)
+        self._codec = get_codec(config.output_compression, config.output_compression_level)
+        if config.parquet_output:
+            parquet_writer.require_pyarrow()
+        # Test case keys read from work item fields in SDK mode, and the fields a batch request asks for
+        self._test_case_field_names = work_item_field_names("test_case")
+        self._test_case_work_item_fields = list(self._test_case_field_names.values()) + [json_projections.STEPS_FIELD]
+        self._reset_caches()
+        self._checkpoint: Optional[ExtractionCheckpoint] = None
+        self._baseline: Optional[ExtractionBaseline] = None
+        # Runs last updated before this time had all their results read by this extraction
+        self._extraction_started: Optional[datetime] = None
+    
+    @property
+    def _test_api(self):
+        """Client serving the test endpoints in the configured API mode"""
+        return self.client.rest_client if self._raw_json else self.client.test_client
         
-    async def extract_all(self) -> Dict[str, Any]:
+    async def extract_all(self, resume_dir: Optional[str] = None, baseline_dir: Optional[str] = None) -> Dict[str, Any]:
         """Extract all test plans data with all related entities"""
         self.logger.info("Starting extraction of all Azure Test Plans data")
+        self._extraction_started = datetime.now(timezone.utc)
+        
+        if baseline_dir:
+            # Delta mode: only re-fetch what changed since the baseline and merge the rest
+            self.logger.info(f"Running a delta extraction against baseline: {baseline_dir}")
+            self._baseline = ExtractionBaseline(baseline_dir)
+            if self._baseline.identity_references != self.config.identity_references:
+                # Reused suites and results would mix identity IDs and identity records
+                raise ValueError(
+                    f"Baseline {baseline_dir} was written with identity_references={self._baseline.identity_references}, "
+                    f"but this run uses identity_references={self.config.identity_references}"
+                )
         
-        # Create a timestamp-based directory for this extraction
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        extraction_dir = os.path.join(self.output_dir, timestamp)
-        os.makedirs(extraction_dir, exist_ok=True)
+        if resume_dir:
+            # Continue an interrupted streaming extraction in its own directory
+            extraction_dir = resume_dir
+            self.logger.info(f"Resuming extraction in: {extraction_dir}")
+        else:
+            # Create a timestamp-based directory for this extraction
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            extraction_dir = os.path.join(self.output_dir, timestamp)
+            os.makedirs(extraction_dir, exist_ok=True)
+        self._reset_caches()
+        if self._baseline:
+            # Reused suites and carried-over results refer to the baseline identities
+            self._identities.load(self._baseline.identities)
+        await self.client.prewarm_connections()
         
-        # Extract all test plans with their hierarchical data
-        test_plans = await self.extract_test_plans()
+        try:
+            if resume_dir or self.config.output_format in ("ndjson", "sqlite"):
+                return await self._extract_all_streaming(extraction_dir)
+            return await self._extract_all_in_memory(extraction_dir)
+        finally:
+            if self._baseline:
+                self._baseline.close()
+                self._baseline = None
+    
+    async def _extract_all_in_memory(self, extraction_dir: str) -> Dict[str, Any]:
+        """Extract all data in memory and save it as JSON files at the end"""
         
-        # Extract additional entities
-        test_configurations = await self.extract_test_configurations()
-        test_variables = await self.extract_test_variables()
+        # Get all test plans, along with additional entities
+        plans, test_configurations, test_variables = await asyncio.gather(
+            self._list_test_plans(),
+            self.extract_test_configurations(),
+            self.extract_test_variables()
+        )
+        test_plans = []
         test_points = []
         test_results = []
         
-        # For each test plan, extract all test points and results
-        for plan in test_plans:
-            plan_points = await self.extract_test_points_for_plan(plan["id"])
+        # Extract each plan with its hierarchy, points and results (gather keeps plan order)
+        for test_plan, plan_points, plan_results in await asyncio.gather(*(
+            self._extract_plan_data(plan) for plan in plans
+        )):
+            test_plans.append(test_plan)
             test_points.extend(plan_points)
-            
-            # Extract test results for each test point
-            for point in plan_points:
-                point_results = await self.extract_test_results_for_point(point["id"])
-                test_results.extend(point_results)
+            test_results.extend(plan_results)
         
         # Create the complete extraction result
         extraction_result = {
@@ -49,7 +126,8 @@ class AzureTestExtractor:
             "test_configurations": test_configurations,
             "test_variables": test_variables,
             "test_points": test_points,
-            "test_results": test_results
+            "test_results": test_results,
+            "identities": self._identities.values()
         }
         
         # Save the extraction data
@@ -57,124 +135,270 @@ class AzureTestExtractor:
         
         self.logger.info(f"Extraction completed successfully. Data saved in: {extraction_dir}")
         return extraction_result
+    
+    async def _extract_all_streaming(self, extraction_dir: str) -> Dict[str, int]:
+        """Extract all data, appending every entity to NDJSON files or the SQLite store and checkpointing completed work"""
+        if self.config.output_format == "sqlite":
+            writer = SqliteStore(extraction_dir, self._serializer)
+        else:
+            writer = NdjsonWriter(extraction_dir, self._serializer, self._codec)
+        self._checkpoint = ExtractionCheckpoint(extraction_dir, self._serializer)
+        resumed = self._checkpoint.resumed
+        # Drop anything written after the last committed work unit, all of it if the run
+        # being resumed stopped before committing any
+        writer.restore(self._checkpoint.writer_state or {})
+        started = self._checkpoint.get("extraction")
+        if started:
+            # Plans committed by the interrupted run read their test runs as of its start
+            self._extraction_started = datetime.fromisoformat(started["started"])
+        else:
+            self._checkpoint.record("extraction", data={"started": self._extraction_started.isoformat()})
+        if resumed:
+            # Identities seen by the interrupted run may be referenced by the units it completed
+            self._identities.load(self._checkpoint.get_all("identity").values())
+        
+        try:
+            # Project-level entities are each committed as a single work unit
+            for entity_type, extract in (
+                ("test_configurations", self.extract_test_configurations),
+                ("test_variables", self.extract_test_variables)
+            ):
+                if not self._checkpoint.is_done(entity_type):
+                    writer.write_many(entity_type, await extract())
+                    self._checkpoint.record(entity_type, writer_state=writer.state())
+            
+            plans = await self._list_test_plans()
+            pending_plans = [plan for plan in plans if not self._checkpoint.is_done("test_plan", self._entity_id(plan))]
+            if len(pending_plans) < len(plans):
+                self.logger.info(f"Skipping {len(plans) - len(pending_plans)} test plans completed in a previous run")
+            
+            # Only a window of plans is held in memory at a time
+            for window in self._chunk(pending_plans, self.config.streaming_plan_window):
+                # gather keeps plan order, so the files are written deterministically
+                for test_plan, plan_points, plan_results in await asyncio.gather(*(
+                    self._extract_plan_data(plan) for plan in window
+                )):
+                    writer.write("test_plans", test_plan)
+                    writer.write_many("test_points", plan_points)
+                    writer.write_many("test_results", plan_results)
+                    self._checkpoint_identities()
+                    # The plan is in the output now, so its suites and result chunks are no longer needed
+                    self._checkpoint.record("test_plan", test_plan["id"], writer_state=writer.state(), closes_scope=True)
+                # Keep the log from growing with the data of every committed plan
+                self._checkpoint.compact()
+                # Nor memory with the suites and test cases of every plan seen so far
+                self._evict_caches()
+            
+            if not self._checkpoint.is_done("identities"):
+                # The identity table is complete only once every plan has been extracted
+                writer.write_many("identities", self._identities.values())
+                self._checkpoint.record("identities", writer_state=writer.state())
+        finally:
+            writer.close()
+            self._checkpoint.close()
+            self._checkpoint = None
+        
+        if self.config.sqlite_output and writer.FORMAT != SqliteStore.FORMAT:
+            self._write_sqlite_store(extraction_dir, {
+                entity_type: read_entities(extraction_dir, entity_type) for entity_type in writer.counts
+            })
+        if self.config.parquet_output:
+            # Parquet files cannot be truncated back to a checkpoint, so they are exported from the committed output
+            self._write_parquet(extraction_dir, {
+                entity_type: read_entities(extraction_dir, entity_type) for entity_type in parquet_writer.COLUMNS
+            })
+        
+        # Summary is computed from the writer's running counters
+        self._save_extraction_summary(writer.counts, extraction_dir, writer.write_stats, writer.FORMAT, resumed=resumed)
+        self.logger.info(f"Extraction completed successfully. Data saved in: {extraction_dir}")
+        return dict(writer.counts)
+    
+    async def _extract_plan_data(self, plan: Any) -> Tuple[Dict, List[Dict], List[Dict]]:
+        """Extract a test plan with its hierarchical data, test points and test results"""
+        plan_id = self._entity_id(plan)
+        # Each phase has its own retry time budget
+        with self.client.retry_phase("test_plans"):
+            test_plan = await self._extract_test_plan(plan)
+        with self.client.retry_phase("test_points"):
+            plan_points = await self.extract_test_points_for_plan(plan_id)
+        with self.client.retry_phase("test_results"):
+            plan_results = await self._extract_results_for_plan_points(plan_id, plan_points)
+        return test_plan, plan_points, plan_results
+    
+    async def _extract_results_for_plan_points(self, plan_id: int, plan_points: List[Dict]) -> List[Dict]:
+        """Extract the test results of a plan's test points from the test runs of the plan"""
+        point_ids = [point["id"] for point in plan_points]
+        if not point_ids:
+            return []
+        
+        async def extract_plan_results() -> List[Dict]:
+            # Page through the test runs of the plan and join results back to its points
+            point_results_by_id = await self.extract_test_results_for_plan_runs(plan_id, point_ids)
+            if self._baseline:
+                self._carry_over_results(point_results_by_id)
+            # Results are grouped by point, so they follow point order
+            return [result for point_results in point_results_by_id.values() for result in point_results]
         
+        return await self._checkpointed(
+            "plan_results",
+            plan_id,
+            extract_plan_results,
+            scope=plan_id
+        )
+        
+    def _carry_over_results(self, point_results_by_id: Dict[int, List[Dict]]) -> None:
+        """Merge the baseline results not read again into the results of each test point, in full extraction order"""
+        refreshed_run_ids = {
+            result["test_run_id"] for point_results in point_results_by_id.values() for result in point_results
+        }
+        carried_over = 0
+        for result in self._baseline.iter_carried_over_results(point_results_by_id, refreshed_run_ids):
+            point_results_by_id[result["test_point_id"]].append(result)
+            carried_over += 1
+        self._delta_stats["carried_over_results"] += carried_over
+        
+        for point_results in point_results_by_id.values():
+            # Result IDs restart in every run, so a point's results are ordered by run, then by result
+            point_results.sort(key=lambda result: (int(result["test_run_id"] or 0), int(result["id"] or 0)))
+    
     async def extract_test_plans(self) -> List[Dict]:
         """Extract all test plans with their hierarchical data"""
+        plans = await self._list_test_plans()
+        
+        # Walk the hierarchy of every plan concurrently; gather preserves plan order
+        return list(await asyncio.gather(*(self._extract_test_plan(plan) for plan in plans)))
+    
+    async def _list_test_plans(self) -> List[Any]:
+        """Get all test plans of the project"""
         self.logger.info("Extracting test plans")
-        test_plans = []
         
         # Get all test plans
-        plans = await self.client.test_client.get_test_plans(
-            project=self.config.project_name
-        )
-        
-        for plan in plans:
-            test_plan = {
-                "id": plan.id,
-                "name": plan.name,
-                "area_path": plan.area_path,
-                "iteration_path": plan.iteration_path,
-                "description": plan.description,
-                "start_date": plan.start_date,
-                "end_date": plan.end_date,
-                "state": plan.state,
-                "owner": self._extract_identity_ref(plan.owner) if hasattr(plan, 'owner') else None,
-                "revision": plan.revision if hasattr(plan, 'revision') else None,
-                "build_id": plan.build_id if hasattr(plan, 'build_id') else None,
-                "build_definition": self._extract_build_definition_ref(plan.build_definition) if hasattr(plan, 'build_definition') else None,
-                "release_environment_definition": self._extract_release_env_def(plan.release_environment_definition) if hasattr(plan, 'release_environment_definition') else None,
-                "test_outcome_settings": plan.test_outcome_settings.sync_outcome_across_suites if hasattr(plan, 'test_outcome_settings') else None,
-                "updated_date": plan.updated_date if hasattr(plan, 'updated_date') else None,
-                "updated_by": self._extract_identity_ref(plan.updated_by) if hasattr(plan, 'updated_by') else None,
-                "test_suites": await self._extract_test_suites(plan.id)
-            }
-            test_plans.append(test_plan)
-            
-        return test_plans
+        with self.client.retry_phase("test_plans"):
+            return await self._call_api(
+                self._test_api.get_test_plans,
+                project=self.config.project_name
+            )
+    
+    async def _extract_test_plan(self, plan: Any) -> Dict:
+        """Extract a single test plan with its hierarchical data"""
+        test_plan = self._projectors["test_plan"](plan)
+        test_plan["test_suites"] = await self._extract_test_suites(test_plan["id"])
+        return test_plan
     
     async def _extract_test_suites(self, plan_id: int) -> List[Dict]:
         """Extract all test suites for a given test plan"""
         self.logger.info(f"Extracting test suites for plan ID: {plan_id}")
-        suites = []
         
-        plan_suites = await self.client.test_client.get_test_suites(
-            project=self.config.project_name,
-            plan_id=plan_id
-        )
+        plan_suites = await self._get_plan_suites(plan_id)
         
-        for suite in plan_suites:
-            test_suite = {
-                "id": suite.id,
-                "name": suite.name,
-                "parent_suite_id": suite.parent_suite.id if hasattr(suite, 'parent_suite') and suite.parent_suite else None,
-                "default_configurations": self._extract_test_configurations_refs(suite.default_configurations) if hasattr(suite, 'default_configurations') else None,
-                "inherit_default_configurations": suite.inherit_default_configurations if hasattr(suite, 'inherit_default_configurations') else True,
-                "state": suite.state if hasattr(suite, 'state') else None,
-                "last_updated_by": self._extract_identity_ref(suite.last_updated_by) if hasattr(suite, 'last_updated_by') else None,
-                "last_updated_date": suite.last_updated_date if hasattr(suite, 'last_updated_date') else None,
-                "suite_type": suite.suite_type if hasattr(suite, 'suite_type') else None,
-                "requirement_id": suite.requirement_id if hasattr(suite, 'requirement_id') else None,
-                "query_string": suite.query_string if hasattr(suite, 'query_string') else None,
-                "test_cases": await self._extract_test_cases(plan_id, suite.id)
-            }
-            suites.append(test_suite)
-            
-        return suites
+        return list(await asyncio.gather(*(
+            self._checkpointed(
+                "test_suite",
+                f"{plan_id}:{self._entity_id(suite)}",
+                lambda suite=suite: self._extract_test_suite(plan_id, suite),
+                scope=plan_id
+            ) for suite in plan_suites
+        )))
+    
+    async def _extract_test_suite(self, plan_id: int, suite: Any) -> Dict:
+        """Extract a single test suite with its test cases"""
+        test_suite = self._projectors["test_suite"](suite)
+        # Delta runs list the test cases of every suite too: editing a test case does not move
+        # the last_updated_date of its suites, so only the revision of each case tells it changed
+        test_suite["test_cases"] = await self._extract_test_cases(plan_id, test_suite["id"])
+        return test_suite
     
     async def _extract_test_cases(self, plan_id: int, suite_id: int) -> List[Dict]:
         """Extract all test cases for a given test suite"""
         self.logger.info(f"Extracting test cases for plan ID: {plan_id}, suite ID: {suite_id}")
-        test_cases = []
         
-        suite_test_cases = await self.client.test_client.get_test_cases(
+        suite_test_cases = await self._call_api(
+            self._test_api.get_test_cases,
             project=self.config.project_name,
             plan_id=plan_id,
             suite_id=suite_id
         )
         
-        for case in suite_test_cases:
-            test_case = {
-                "id": case.id,
-                "name": case.name,
-                "work_item_id": case.work_item.id if hasattr(case, 'work_item') and case.work_item else None,
-                "work_item_url": case.work_item.url if hasattr(case, 'work_item') and case.work_item else None,
-                "order": case.order if hasattr(case, 'order') else None,
-                "point_assignments": self._extract_point_assignments(case.point_assignments) if hasattr(case, 'point_assignments') else None,
-                "priority": case.priority if hasattr(case, 'priority') else None,
-                "description": case.description if hasattr(case, 'description') else None,
-                "steps": await self._extract_test_steps(case.id)
-            }
-            test_cases.append(test_case)
-            
-        return test_cases
+        return list(await asyncio.gather(*(self._extract_test_case(case) for case in suite_test_cases)))
+    
+    async def _extract_test_case(self, case: Any) -> Dict:
+        """Extract a single test case with its test steps"""
+        steps_xml = None
+        if self._raw_json:
+            # Work item fields come as a list of single-field objects; merged, the spec can address them
+            case["fields"] = json_projections.work_item_fields(case)
+            # Steps come with the test case as work item XML, so they are parsed instead of fetched
+            steps_xml = case["fields"].get(json_projections.STEPS_FIELD) or ""
+        test_case = self._projectors["test_case"](case)
+        if not self._raw_json and test_case["id"] is not None:
+            # Work item references carry the ID as a string, unlike the REST payloads
+            test_case["id"] = test_case["work_item_id"] = int(test_case["id"])
+            # SDK suite test cases come without their work item fields, so those are fetched in batches
+            fields = await self._get_test_case_fields(test_case["id"])
+            if fields is not None:
+                for name, reference_name in self._test_case_field_names.items():
+                    if test_case[name] is None:
+                        test_case[name] = fields.get(reference_name)
+                steps_xml = fields.get(json_projections.STEPS_FIELD) or ""
+        test_case["steps"] = await self._extract_test_steps(test_case["id"], test_case["revision"], steps_xml)
+        return test_case
     
-    async def _extract_test_steps(self, test_case_id: int) -> List[Dict]:
+    async def _get_test_case_fields(self, test_case_id: int) -> Optional[Dict]:
+        """Work item fields of a test case, fetched in a batch shared with concurrently extracted test cases"""
+        try:
+            return await self._cached("test_case_fields", test_case_id, lambda: self._work_items.get(test_case_id))
+        except Exception as e:
+            self._skip_failed_lookup(f"Error fetching work item fields of test case {test_case_id}", e)
+            return None
+    
+    async def _fetch_test_case_work_items(self, work_item_ids: List[int]) -> Dict[int, Dict]:
+        """Fetch the test case fields of a batch of work items in one request"""
+        self.logger.info(f"Fetching {len(work_item_ids)} test case work items starting at ID: {work_item_ids[0]}")
+        work_items = await self._call_api(
+            self.client.work_item_client.get_work_items_batch,
+            work_item_get_request=WorkItemBatchGetRequest(
+                ids=work_item_ids,
+                fields=self._test_case_work_item_fields,
+                # Deleted or inaccessible test cases are left out instead of failing the batch
+                error_policy="omit"
+            ),
+            project=self.config.project_name
+        )
+        return {work_item.id: work_item.fields or {} for work_item in work_items if work_item is not None}
+    
+    async def _extract_test_steps(self, test_case_id: int, revision: Optional[int] = None, steps_xml: Optional[str] = None) -> List[Dict]:
         """Extract all test steps for a given test case"""
-        self.logger.info(f"Extracting test steps for test case ID: {test_case_id}")
-        steps = []
-        
         try:
-            test_steps = await self.client.test_client.get_test_steps(
-                project=self.config.project_name,
-                test_case_id=test_case_id
+            # A test case appearing in many suites is fetched once; every appearance shares the same steps list
+            return await self._cached(
+                "test_steps",
+                (test_case_id, revision),
+                lambda: self._fetch_test_steps(test_case_id, revision, steps_xml)
             )
-            
-            for step in test_steps:
-                test_step = {
-                    "id": step.id,
-                    "action": step.action,
-                    "expected_result": step.expected_result,
-                    "step_identifier": step.step_identifier if hasattr(step, 'step_identifier') else None,
-                    "parameters": step.parameters if hasattr(step, 'parameters') else None,
-                    "data": step.data if hasattr(step, 'data') else None,
-                    "title": step.title if hasattr(step, 'title') else None,
-                    "parameters_string": step.parameters_string if hasattr(step, 'parameters_string') else None
-                }
-                steps.append(test_step)
         except Exception as e:
-            self.logger.warning(f"Error extracting test steps for test case {test_case_id}: {str(e)}")
-            
-        return steps
+            self._skip_failed_lookup(f"Error extracting test steps for test case {test_case_id}", e)
+            return []
+    
+    async def _fetch_test_steps(self, test_case_id: int, revision: Optional[int] = None, steps_xml: Optional[str] = None) -> List[Dict]:
+        """Fetch and convert the test steps of a test case"""
+        if self._baseline:
+            # Test cases still at their baseline revision keep their baseline steps
+            baseline_steps = self._baseline.get_unchanged_steps(test_case_id, revision)
+            self._delta_stats["reused_test_cases" if baseline_steps is not None else "refetched_test_cases"] += 1
+            if baseline_steps is not None:
+                return baseline_steps
+        
+        if steps_xml is not None:
+            return json_projections.parse_test_steps(steps_xml)
+        
+        self.logger.info(f"Extracting test steps for test case ID: {test_case_id}")
+        test_steps = await self._call_api(
+            self._test_api.get_test_steps,
+            project=self.config.project_name,
+            test_case_id=test_case_id
+        )
+        
+        return [self._projectors["test_step"](step) for step in test_steps]
     
     async def extract_test_configurations(self) -> List[Dict]:
         """Extract all test configurations"""
@@ -182,23 +406,16 @@ class AzureTestExtractor:
         configurations = []
         
         try:
-            config_list = await self.client.test_client.get_test_configurations(
-                project=self.config.project_name
-            )
+            with self.client.retry_phase("test_configurations"):
+                config_list = await self._call_api(
+                    self._test_api.get_test_configurations,
+                    project=self.config.project_name
+                )
             
-            for config in config_list:
-                configuration = {
-                    "id": config.id,
-                    "name": config.name,
-                    "description": config.description if hasattr(config, 'description') else None,
-                    "state": config.state if hasattr(config, 'state') else None,
-                    "values": config.values if hasattr(config, 'values') else None,
-                    "is_default": config.is_default if hasattr(config, 'is_default') else False,
-                    "project": config.project.name if hasattr(config, 'project') and config.project else None
-                }
-                configurations.append(configuration)
+            project_configuration = self._projectors["test_configuration"]
+            configurations = [project_configuration(config) for config in config_list]
         except Exception as e:
-            self.logger.warning(f"Error extracting test configurations: {str(e)}")
+            self._skip_failed_lookup("Error extracting test configurations", e)
             
         return configurations
     
@@ -208,21 +425,16 @@ class AzureTestExtractor:
         variables = []
         
         try:
-            var_list = await self.client.test_client.get_test_variables(
-                project=self.config.project_name
-            )
+            with self.client.retry_phase("test_variables"):
+                var_list = await self._call_api(
+                    self._test_api.get_test_variables,
+                    project=self.config.project_name
+                )
             
-            for var in var_list:
-                variable = {
-                    "id": var.id,
-                    "name": var.name,
-                    "description": var.description if hasattr(var, 'description') else None,
-                    "values": var.values if hasattr(var, 'values') else None,
-                    "scope": var.scope if hasattr(var, 'scope') else None
-                }
-                variables.append(variable)
+            project_variable = self._projectors["test_variable"]
+            variables = [project_variable(var) for var in var_list]
         except Exception as e:
-            self.logger.warning(f"Error extracting test variables: {str(e)}")
+            self._skip_failed_lookup("Error extracting test variables", e)
             
         return variables
     
@@ -233,149 +445,299 @@ class AzureTestExtractor:
         
         try:
             # Get all suites for this plan
-            suites = await self.client.test_client.get_test_suites(
-                project=self.config.project_name,
-                plan_id=plan_id
-            )
+            suites = await self._get_plan_suites(plan_id)
             
-            # For each suite, get the test points
-            for suite in suites:
-                suite_points = await self.client.test_client.get_points(
+            # For each suite, get the test points (gather keeps suite order)
+            all_suite_points = await asyncio.gather(*(
+                self._call_api(
+                    self._test_api.get_points,
                     project=self.config.project_name,
                     plan_id=plan_id,
-                    suite_id=suite.id
-                )
-                
-                for point in suite_points:
-                    test_point = {
-                        "id": point.id,
-                        "test_case_id": point.test_case.id if hasattr(point, 'test_case') and point.test_case else None,
-                        "test_case_title": point.test_case.name if hasattr(point, 'test_case') and point.test_case else None,
-                        "configuration_id": point.configuration.id if hasattr(point, 'configuration') and point.configuration else None,
-                        "configuration_name": point.configuration.name if hasattr(point, 'configuration') and point.configuration else None,
-                        "tester": self._extract_identity_ref(point.tester) if hasattr(point, 'tester') and point.tester else None,
-                        "outcome": point.outcome if hasattr(point, 'outcome') else None,
-                        "state": point.state if hasattr(point, 'state') else None,
-                        "plan_id": plan_id,
-                        "suite_id": suite.id
-                    }
-                    points.append(test_point)
+                    suite_id=self._entity_id(suite)
+                ) for suite in suites
+            ))
+            
+            project_point = self._projectors["test_point"]
+            for suite, suite_points in zip(suites, all_suite_points):
+                suite_id = self._entity_id(suite)
+                points.extend(project_point(point, plan_id=plan_id, suite_id=suite_id) for point in suite_points)
         except Exception as e:
-            self.logger.warning(f"Error extracting test points for plan {plan_id}: {str(e)}")
+            self._skip_failed_lookup(f"Error extracting test points for plan {plan_id}", e)
             
         return points
     
-    async def extract_test_results_for_point(self, point_id: int) -> List[Dict]:
-        """Extract all test results for a given test point"""
-        self.logger.info(f"Extracting test results for point ID: {point_id}")
-        results = []
+    async def extract_test_results_for_point(self, point_id: int, plan_id: int) -> List[Dict]:
+        """Extract all test results of a test point from the test runs of its plan"""
+        # The test API only serves results by test run, so the point's plan is needed to find them
+        point_results = await self.extract_test_results_for_plan_runs(plan_id, [point_id])
+        return point_results[point_id]
+    
+    async def extract_test_results_for_plan_runs(self, plan_id: int, point_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Extract all test results of a test plan from its test runs, grouped by point ID"""
+        self.logger.info(f"Extracting test results from test runs for plan ID: {plan_id}")
+        results = {point_id: [] for point_id in point_ids}
         
         try:
-            test_results = await self.client.test_client.get_test_results(
-                project=self.config.project_name,
-                point_ids=[point_id]
-            )
+            runs = await self._extract_test_runs_for_plan(plan_id)
+            if self._baseline:
+                # Only runs updated since the baseline can contain new results
+                refreshed_runs = [run for run in runs if not self._baseline.is_run_unchanged(run)]
+                self._delta_stats["skipped_runs"] += len(runs) - len(refreshed_runs)
+                self._delta_stats["refetched_runs"] += len(refreshed_runs)
+                runs = refreshed_runs
+            
+            # Page through the results of every run in parallel (gather keeps run and page order)
+            pages = await asyncio.gather(*(self._extract_test_run_results(run) for run in runs))
             
-            for result in test_results:
-                test_result = {
-                    "id": result.id,
-                    "test_plan_id": result.test_plan.id if hasattr(result, 'test_plan') and result.test_plan else None,
-                    "test_point_id": point_id,
-                    "test_case_id": result.test_case.id if hasattr(result, 'test_case') and result.test_case else None,
-                    "test_run_id": result.test_run.id if hasattr(result, 'test_run') and result.test_run else None,
-                    "configuration_id": result.configuration.id if hasattr(result, 'configuration') and result.configuration else None,
-                    "outcome": result.outcome if hasattr(result, 'outcome') else None,
-                    "error_message": result.error_message if hasattr(result, 'error_message') else None,
-                    "comment": result.comment if hasattr(result, 'comment') else None,
-                    "state": result.state if hasattr(result, 'state') else None,
-                    "completed_date": result.completed_date if hasattr(result, 'completed_date') else None,
-                    "duration_in_ms": result.duration_in_ms if hasattr(result, 'duration_in_ms') else None,
-                    "started_date": result.started_date if hasattr(result, 'started_date') else None,
-                    "run_by": self._extract_identity_ref(result.run_by) if hasattr(result, 'run_by') and result.run_by else None,
-                    "attachments": result.attachments if hasattr(result, 'attachments') else None,
-                }
-                results.append(test_result)
+            # Join the results back to the test points of the plan
+            for run_results in pages:
+                for result in run_results:
+                    if self._raw_json:
+                        point_id = json_projections.reference_id(result, "testPoint")
+                    else:
+                        point_id = result.test_point.id if hasattr(result, 'test_point') and result.test_point else None
+                    point_id = int(point_id) if point_id is not None else None
+                    if point_id in results:
+                        results[point_id].append(self._extract_test_result(result, point_id))
         except Exception as e:
-            self.logger.warning(f"Error extracting test results for point {point_id}: {str(e)}")
+            self._skip_failed_lookup(f"Error extracting test results from test runs for plan {plan_id}", e)
             
         return results
     
-    def _extract_identity_ref(self, identity_ref: Any) -> Optional[Dict]:
-        """Extract identity reference data"""
-        if not identity_ref:
-            return None
+    async def _extract_test_runs_for_plan(self, plan_id: int) -> List[Any]:
+        """Extract all test runs of a test plan, one page at a time"""
+        runs = []
+        page_size = self.config.results_page_size
         
-        return {
-            "id": identity_ref.id if hasattr(identity_ref, 'id') else None,
-            "display_name": identity_ref.display_name if hasattr(identity_ref, 'display_name') else None,
-            "unique_name": identity_ref.unique_name if hasattr(identity_ref, 'unique_name') else None,
-            "url": identity_ref.url if hasattr(identity_ref, 'url') else None,
-        }
+        while True:
+            page = await self._call_api(
+                self._test_api.get_test_runs,
+                project=self.config.project_name,
+                plan_id=plan_id,
+                # Without run details, total_tests is not returned and result pages are read one by one
+                include_run_details=True,
+                skip=len(runs),
+                top=page_size
+            )
+            runs.extend(page)
+            if len(page) < page_size:
+                return runs
     
-    def _extract_build_definition_ref(self, build_def: Any) -> Optional[Dict]:
-        """Extract build definition reference data"""
-        if not build_def:
-            return None
+    async def _extract_test_run_results(self, run: Any) -> List[Any]:
+        """Extract all results of a test run using $top/$skip paging"""
+        page_size = self.config.results_page_size
+        run_id = self._entity_id(run)
+        if self._raw_json:
+            total_tests = run.get("totalTests")
+        else:
+            total_tests = run.total_tests if hasattr(run, 'total_tests') else None
         
-        return {
-            "id": build_def.id if hasattr(build_def, 'id') else None,
-            "name": build_def.name if hasattr(build_def, 'name') else None,
-        }
-    
-    def _extract_release_env_def(self, rel_env_def: Any) -> Optional[Dict]:
-        """Extract release environment definition reference data"""
-        if not rel_env_def:
-            return None
+        if total_tests:
+            # The run reports its size, so all pages can be requested in parallel
+            pages = await asyncio.gather(*(
+                self._call_api(
+                    self._test_api.get_test_results,
+                    project=self.config.project_name,
+                    run_id=run_id,
+                    skip=skip,
+                    top=page_size
+                ) for skip in range(0, total_tests, page_size)
+            ))
+            return [result for page in pages for result in page]
         
-        return {
-            "definition_id": rel_env_def.definition_id if hasattr(rel_env_def, 'definition_id') else None,
-            "environment_definition_id": rel_env_def.environment_definition_id if hasattr(rel_env_def, 'environment_definition_id') else None,
-        }
+        # Otherwise read pages until a short one is returned
+        results = []
+        while True:
+            page = await self._call_api(
+                self._test_api.get_test_results,
+                project=self.config.project_name,
+                run_id=run_id,
+                skip=len(results),
+                top=page_size
+            )
+            results.extend(page)
+            if len(page) < page_size:
+                return results
     
-    def _extract_test_configurations_refs(self, configs: List[Any]) -> List[Dict]:
-        """Extract test configuration references data"""
-        if not configs:
-            return []
+    def _extract_test_result(self, result: Any, point_id: int) -> Dict:
+        """Extract test result data"""
+        return self._projectors["test_result"](result, test_point_id=point_id)
+    
+    async def _checkpointed(self, unit: str, key: str, extract: Callable[[], Awaitable[Any]], scope: Any = None) -> Any:
+        """Reuse a work unit completed by an interrupted run, or extract and checkpoint it until its scope is committed"""
+        if self._checkpoint and self._checkpoint.is_done(unit, key):
+            return self._checkpoint.get(unit, key)
         
-        return [{
-            "id": config.id if hasattr(config, 'id') else None,
-            "name": config.name if hasattr(config, 'name') else None,
-        } for config in configs]
+        data = await extract()
+        if self._checkpoint:
+            self._checkpoint_identities()
+            self._checkpoint.record(unit, key, data, scope=scope)
+        return data
     
-    def _extract_point_assignments(self, assignments: List[Any]) -> List[Dict]:
-        """Extract point assignments data"""
-        if not assignments:
-            return []
+    def _skip_failed_lookup(self, message: str, error: Exception) -> None:
+        """Log a failed lookup and carry on without its entities, unless the run is checkpointed
+
+        A checkpointed unit missing those entities would be recorded as complete and never retried
+        on resume, so the error stops the run instead.
+        """
+        if self._checkpoint:
+            raise error
+        self.logger.warning(f"{message}: {str(error)}")
+    
+    def _checkpoint_identities(self) -> None:
+        """Log the identities interned since the last work unit, ahead of the units referring to them"""
+        for identity in self._identities.drain_new():
+            self._checkpoint.record("identity", identity["id"], identity)
+    
+    async def _get_plan_suites(self, plan_id: int) -> List[Any]:
+        """Get the suites of a test plan, enumerating them at most once per extraction run"""
+        return await self._cached(
+            "test_suites",
+            plan_id,
+            lambda: self._call_api(
+                self._test_api.get_test_suites,
+                project=self.config.project_name,
+                plan_id=plan_id
+            )
+        )
+    
+    async def _cached(self, cache_name: str, key: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a run-scoped cached value, coalescing concurrent lookups of the same key into one fetch"""
+        cache = self._caches[cache_name]
+        stats = self._cache_stats[cache_name]
+        if key in cache:
+            stats["hits"] += 1
+        else:
+            stats["misses"] += 1
+            # Cache the pending fetch so concurrent callers share a single request
+            future = asyncio.ensure_future(fetch())
+            future.add_done_callback(functools.partial(self._evict_failed, cache, key))
+            cache[key] = future
         
-        return [{
-            "configuration_id": assignment.configuration_id if hasattr(assignment, 'configuration_id') else None,
-            "tester": self._extract_identity_ref(assignment.tester) if hasattr(assignment, 'tester') and assignment.tester else None,
-        } for assignment in assignments]
+        # A cancelled caller must not cancel the fetch the other callers are waiting on
+        return await asyncio.shield(cache[key])
+    
+    @staticmethod
+    def _evict_failed(cache: Dict[Any, asyncio.Future], key: Any, future: asyncio.Future) -> None:
+        """Do not keep failed or cancelled fetches around so a later caller can retry"""
+        if (future.cancelled() or future.exception() is not None) and cache.get(key) is future:
+            del cache[key]
+    
+    def _evict_caches(self) -> None:
+        """Drop the cached suites and test cases once no extraction is waiting on them, keeping the counters"""
+        for cache in self._caches.values():
+            cache.clear()
+    
+    def _reset_caches(self) -> None:
+        """Reset the run-scoped caches and their hit/miss counters"""
+        self._identities.reset()
+        self._caches: Dict[str, Dict[Any, asyncio.Future]] = {
+            "test_suites": {},
+            "test_steps": {},
+            "test_case_fields": {}
+        }
+        self._work_items = WorkItemBatcher(self._fetch_test_case_work_items, self.config.work_item_batch_size)
+        self._cache_stats = {
+            cache_name: {"hits": 0, "misses": 0} for cache_name in self._caches
+        }
+        self._delta_stats = {
+            "reused_test_cases": 0,
+            "refetched_test_cases": 0,
+            "skipped_runs": 0,
+            "refetched_runs": 0,
+            "carried_over_results": 0
+        }
+    
+    async def _call_api(self, method: Any, **kwargs) -> Any:
+        """Call an Azure DevOps API method within the global concurrency limit"""
+        async with self._api_semaphore:
+            return await method(**kwargs)
+    
+    def _entity_id(self, entity: Any) -> Any:
+        """ID of an SDK model or raw JSON entity"""
+        return entity["id"] if self._raw_json else entity.id
+    
+    @staticmethod
+    def _chunk(items: List[Any], size: int) -> List[List[Any]]:
+        """Split a list into consecutive chunks of at most size items"""
+        size = max(1, size)
+        return [items[i:i + size] for i in range(0, len(items), size)]
     
     def _save_extraction_data(self, data: Dict[str, Any], output_dir: str) -> None:
         """Save extraction data to JSON files"""
+        write_stats = WriteStats(self._codec)
+        extension = self._codec.extension if self._codec else ""
         # Save each entity type to a separate file
         for entity_type, entities in data.items():
-            filename = f"{entity_type}.json"
+            filename = f"{entity_type}.json{extension}"
             file_path = os.path.join(output_dir, filename)
             
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(entities, f, indent=2, default=str)
+            started = time.perf_counter()
+            with CompressedFile(file_path, "wb", self._codec, write_stats) as f:
+                self._serializer.dump(entities, f)
+            write_stats.seconds += time.perf_counter() - started
             
             self.logger.info(f"Saved {len(entities)} {entity_type} to {file_path}")
         
+        if self.config.sqlite_output:
+            self._write_sqlite_store(output_dir, data)
+        if self.config.parquet_output:
+            self._write_parquet(output_dir, data)
+        
         # Also save a summary file
+        self._save_extraction_summary(
+            {entity_type: len(entities) for entity_type, entities in data.items()},
+            output_dir,
+            write_stats,
+            self.config.output_format
+        )
+    
+    def _write_sqlite_store(self, output_dir: str, data: Dict[str, Iterable[Any]]) -> None:
+        """Write the extracted entities to an indexed SQLite database next to the entity files"""
+        store = SqliteStore(output_dir, self._serializer)
+        try:
+            for entity_type, entities in data.items():
+                store.write_many(entity_type, entities)
+        finally:
+            store.close()
+    
+    def _write_parquet(self, output_dir: str, data: Dict[str, Iterable[Any]]) -> None:
+        """Write test points and test results as columnar Parquet files"""
+        # Parquet compresses column chunks itself, with the same codecs as the entity files
+        compression = "snappy" if self.config.output_compression == "none" else self.config.output_compression
+        for entity_type in parquet_writer.COLUMNS:
+            writer = parquet_writer.ParquetWriter(output_dir, entity_type, compression)
+            try:
+                writer.write_many(data.get(entity_type, []))
+            finally:
+                writer.close()
+    
+    def _save_extraction_summary(self, counts: Dict[str, int], output_dir: str, write_stats: WriteStats, output_format: str, resumed: bool = False) -> None:
+        """Save a summary of the extraction process"""
         summary = {
             "extraction_date": datetime.now().isoformat(),
+            # Watermark of a delta extraction using this one as its baseline
+            "extraction_started": self._extraction_started.isoformat(),
             "project": self.config.project_name,
             "organization": self.config.organization_url,
-            "counts": {
-                entity_type: len(entities) for entity_type, entities in data.items()
-            }
+            "output_format": output_format,
+            "sqlite_output": self.config.sqlite_output,
+            "parquet_output": self.config.parquet_output,
+            "identity_references": self.config.identity_references,
+            "resumed": resumed,
+            "counts": counts,
+            "output": write_stats.stats(),
+            "cache_stats": self._cache_stats,
+            "work_item_batches": self._work_items.stats(),
+            "rate_limiter": self.client.rate_limiter.stats(),
+            "retries": self.client.retry_policy.stats(),
+            "connection_pool": self.client.pool_stats()
         }
+        if self._baseline:
+            summary["delta"] = dict(self._delta_stats, baseline=self._baseline.baseline_dir)
         
         summary_path = os.path.join(output_dir, "extraction_summary.json")
-        with open(summary_path, "w", encoding="utf-8") as f:
-            json.dump(summary, f, indent=2)
+        with open(summary_path, "wb") as f:
+            self._serializer.dump(summary, f)
         
-        self.logger.info(f"Saved extraction summary to {summary_path}") 
\ No newline at end of file
+        self.logger.info(f"Saved extraction summary to {summary_path}")
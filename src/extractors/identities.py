@@ -0,0 +1,48 @@
+from typing import Any, Callable, Dict, Iterable, List, Union
+
+class IdentityTable:
+    """Run-scoped intern table of the identities referenced by extracted entities"""
+
+    def __init__(self, project: Callable[[Any], Dict], by_id: bool):
+        # Projector converting an SDK identity model or REST identity JSON into an identity record
+        self._project = project
+        self.by_id = by_id
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every identity, at the start of an extraction run"""
+        self._identities: Dict[str, Dict] = {}
+        self._new: List[Dict] = []
+
+    def reference(self, identity: Any) -> Union[str, Dict, None]:
+        """Intern an identity and return how entities refer to it: its ID, or the shared record"""
+        if not identity:
+            return None
+        identity_id = identity.get("id") if isinstance(identity, dict) else getattr(identity, "id", None)
+        record = self._identities.get(identity_id)
+        if record is None:
+            record = self._project(identity)
+            if identity_id is None:
+                # Nothing to intern it under, so it stays inline
+                return record
+            self._identities[identity_id] = record
+            self._new.append(record)
+        return identity_id if self.by_id else record
+
+    def load(self, records: Iterable[Dict]) -> None:
+        """Register identity records written by an earlier run"""
+        for record in records:
+            if record.get("id") is not None:
+                self._identities.setdefault(record["id"], record)
+
+    def drain_new(self) -> List[Dict]:
+        """Identities interned since the last call"""
+        new, self._new = self._new, []
+        return new
+
+    def values(self) -> List[Dict]:
+        """Every identity interned in this run, in first-seen order"""
+        return list(self._identities.values())
+
+    def __len__(self) -> int:
+        return len(self._identities)
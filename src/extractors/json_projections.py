@@ -0,0 +1,39 @@
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Dict, List, Optional
+from storage.records import TestStep
+
+# Work item field holding the steps of a test case as XML
+STEPS_FIELD = "Microsoft.VSTS.TCM.Steps"
+
+def reference_id(item: Dict, key: str, field: str = "id") -> Any:
+    """Read a field of a nested reference, such as the id of testPoint"""
+    reference = item.get(key)
+    return reference.get(field) if reference else None
+
+def work_item_fields(case: Dict) -> Dict[str, Any]:
+    """Merge the work item fields of a suite test case, returned as a list of single-field objects"""
+    fields = {}
+    for field in reference_id(case, "workItem", "workItemFields") or []:
+        fields.update(field)
+    return fields
+
+def parse_test_steps(steps_xml: Optional[str]) -> List[Dict]:
+    """Parse the steps XML of a test case work item
+
+    Shared steps are not expanded: a compref element only references the shared steps work item,
+    so its steps are not part of the XML. Steps nested in a compref element are parsed like the others.
+    """
+    if not steps_xml:
+        return []
+
+    steps = []
+    for step in ElementTree.fromstring(steps_xml).iter("step"):
+        # Action first, expected result second
+        texts = [element.text for element in step.findall("parameterizedString")]
+        steps.append(TestStep(
+            id=int(step.get("id")),
+            action=texts[0] if texts else None,
+            expected_result=texts[1] if len(texts) > 1 else None,
+            step_identifier=step.get("id")
+        ))
+    return steps
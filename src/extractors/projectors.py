@@ -0,0 +1,298 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Type, Union
+from storage.records import Record, TestCase, TestPoint, TestResult, TestStep
+
+class Field(NamedTuple):
+    """How one output key of an entity is read from an SDK model or a REST JSON payload"""
+    name: str
+    # Dotted attribute path on SDK models, defaults to the output key
+    path: Optional[str] = None
+    # Path in the REST JSON payload, defaults to the camelCase form of the attribute path.
+    # A tuple addresses keys that contain dots, such as work item field reference names
+    json_path: Optional[Union[str, Tuple[str, ...]]] = None
+    # Nested entity spec applied to the value, to each item of it when many is set
+    spec: Optional[str] = None
+    many: bool = False
+    # Value used when the attribute or key is missing
+    default: Any = None
+    # Read directly, so a missing value raises instead of defaulting
+    required: bool = False
+    # Supplied by the caller as a keyword argument of the projector instead of read from the entity
+    argument: bool = False
+
+ENTITY_SPECS: Dict[str, List[Field]] = {
+    "identity_ref": [
+        Field("id"),
+        Field("display_name"),
+        Field("unique_name"),
+        Field("url"),
+    ],
+    "build_definition_ref": [
+        Field("id"),
+        Field("name"),
+    ],
+    "release_environment_definition_ref": [
+        Field("definition_id"),
+        Field("environment_definition_id"),
+    ],
+    "test_configuration_ref": [
+        Field("id"),
+        Field("name"),
+    ],
+    "point_assignment": [
+        Field("configuration_id", path="configuration.id", json_path="configurationId"),
+        Field("tester", spec="identity_ref"),
+    ],
+    "test_plan": [
+        Field("id", required=True),
+        Field("name"),
+        Field("area_path"),
+        Field("iteration_path", json_path="iteration"),
+        Field("description"),
+        Field("start_date"),
+        Field("end_date"),
+        Field("state"),
+        Field("owner", spec="identity_ref"),
+        Field("revision"),
+        Field("build_id"),
+        Field("build_definition", spec="build_definition_ref"),
+        Field("release_environment_definition", spec="release_environment_definition_ref"),
+        Field("test_outcome_settings", path="test_outcome_settings.sync_outcome_across_suites"),
+        Field("updated_date"),
+        Field("updated_by", spec="identity_ref"),
+    ],
+    "test_suite": [
+        Field("id", required=True),
+        Field("name"),
+        Field("parent_suite_id", path="parent_suite.id"),
+        Field("default_configurations", spec="test_configuration_ref", many=True),
+        Field("inherit_default_configurations", default=True),
+        Field("state"),
+        Field("last_updated_by", spec="identity_ref"),
+        Field("last_updated_date"),
+        Field("suite_type"),
+        Field("requirement_id"),
+        Field("query_string"),
+    ],
+    # Test cases wrap a work item reference, test_case on SDK suite test cases and workItem in
+    # REST payloads; the extractor merges the REST field list into "fields"
+    "test_case": [
+        Field("id", path="test_case.id", json_path="workItem.id"),
+        Field("name", path="test_case.name", json_path="workItem.name"),
+        Field("work_item_id", path="test_case.id", json_path="workItem.id"),
+        Field("work_item_url", path="test_case.url", json_path="workItem.url"),
+        Field("order"),
+        Field("point_assignments", spec="point_assignment", many=True),
+        Field("priority", json_path=("fields", "Microsoft.VSTS.Common.Priority")),
+        Field("description", json_path=("fields", "System.Description")),
+        Field("revision", json_path=("fields", "System.Rev")),
+        Field("parameters", json_path=("fields", "Microsoft.VSTS.TCM.Parameters")),
+    ],
+    "test_step": [
+        Field("id", required=True),
+        Field("action"),
+        Field("expected_result"),
+        Field("step_identifier"),
+        Field("parameters"),
+        Field("data"),
+        Field("title"),
+        Field("parameters_string"),
+    ],
+    "test_configuration": [
+        Field("id", required=True),
+        Field("name"),
+        Field("description"),
+        Field("state"),
+        Field("values"),
+        Field("is_default", default=False),
+        Field("project", path="project.name"),
+    ],
+    "test_variable": [
+        Field("id", required=True),
+        Field("name"),
+        Field("description"),
+        Field("values"),
+        Field("scope"),
+    ],
+    "test_point": [
+        Field("id", required=True),
+        Field("test_case_id", path="test_case.id", json_path="testCaseReference.id"),
+        Field("test_case_title", path="test_case.name", json_path="testCaseReference.name"),
+        Field("configuration_id", path="configuration.id"),
+        Field("configuration_name", path="configuration.name"),
+        Field("tester", spec="identity_ref"),
+        Field("outcome", json_path="results.outcome"),
+        Field("state", json_path="results.state"),
+        Field("plan_id", argument=True),
+        Field("suite_id", argument=True),
+    ],
+    "test_result": [
+        Field("id", required=True),
+        Field("test_plan_id", path="test_plan.id"),
+        Field("test_point_id", argument=True),
+        Field("test_case_id", path="test_case.id"),
+        Field("test_run_id", path="test_run.id"),
+        Field("configuration_id", path="configuration.id"),
+        Field("outcome"),
+        Field("error_message"),
+        Field("comment"),
+        Field("state"),
+        Field("completed_date"),
+        Field("duration_in_ms"),
+        Field("started_date"),
+        Field("run_by", spec="identity_ref"),
+        Field("attachments"),
+    ],
+}
+
+# Entity types held in bulk are built as slotted records instead of dicts
+RECORD_CLASSES: Dict[str, Type[Record]] = {
+    "test_case": TestCase,
+    "test_step": TestStep,
+    "test_point": TestPoint,
+    "test_result": TestResult,
+}
+
+def work_item_field_names(entity_type: str) -> Dict[str, str]:
+    """Output keys of an entity read from work item fields, with the reference names of those fields"""
+    return {
+        field.name: field.json_path[1]
+        for field in ENTITY_SPECS[entity_type]
+        if isinstance(field.json_path, tuple) and field.json_path[0] == "fields"
+    }
+
+def _camel_case(name: str) -> str:
+    head, *tail = name.split("_")
+    return head + "".join(part.capitalize() for part in tail)
+
+def _field_path(field: Field, source: str) -> Tuple[str, ...]:
+    if source == "json":
+        if isinstance(field.json_path, tuple):
+            return field.json_path
+        if field.json_path:
+            return tuple(field.json_path.split("."))
+        return tuple(_camel_case(part) for part in (field.path or field.name).split("."))
+    return tuple((field.path or field.name).split("."))
+
+def _generate(entity_type: str, source: str, namespace: Dict[str, Any], known_attributes: Optional[Set[str]] = None) -> str:
+    """Generate the source of a projector; known_attributes are read without a missing-attribute check"""
+    def read(target: str, key: str, default: Any) -> str:
+        if source == "json":
+            return f"{target}.get({key!r}, {default!r})" if default is not None else f"{target}.get({key!r})"
+        if target == "entity" and known_attributes is not None:
+            # Attributes outside the model's map are never set on it
+            return f"entity.{key}" if key in known_attributes else repr(default)
+        return f"getattr({target}, {key!r}, {default!r})"
+
+    lines = []
+    locals_by_prefix: Dict[Tuple[str, ...], str] = {(): "entity"}
+    values = []
+    arguments = []
+
+    for field in ENTITY_SPECS[entity_type]:
+        if field.argument:
+            arguments.append(field.name)
+            values.append(field.name)
+            continue
+
+        path = _field_path(field, source)
+        # Intermediate objects are read once and shared by every field below them
+        for depth in range(1, len(path)):
+            prefix = path[:depth]
+            if prefix not in locals_by_prefix:
+                parent = locals_by_prefix[prefix[:-1]]
+                local = f"v{len(lines)}"
+                if parent == "entity":
+                    lines.append(f"    {local} = {read(parent, prefix[-1], None)}")
+                else:
+                    lines.append(f"    {local} = None if {parent} is None else {read(parent, prefix[-1], None)}")
+                locals_by_prefix[prefix] = local
+        parent = locals_by_prefix[path[:-1]]
+
+        if field.required and len(path) == 1:
+            expression = f"entity[{path[0]!r}]" if source == "json" else f"entity.{path[0]}"
+        elif len(path) == 1:
+            expression = read(parent, path[0], field.default)
+        else:
+            expression = f"({field.default!r} if {parent} is None else {read(parent, path[-1], field.default)})"
+
+        if field.spec:
+            nested = f"project_{field.spec}"
+            local = f"v{len(lines)}"
+            lines.append(f"    {local} = {expression}")
+            if field.many:
+                expression = f"[{nested}(item) for item in {local}] if {local} else []"
+            else:
+                expression = f"{nested}({local}) if {local} else None"
+        values.append(expression)
+
+    signature = ", ".join(["entity"] + arguments)
+    record_class = RECORD_CLASSES.get(entity_type)
+    if record_class:
+        # Record fields follow the spec order, so values are passed positionally
+        names = tuple(field.name for field in ENTITY_SPECS[entity_type])
+        if record_class.__slots__[:len(names)] != names:
+            raise ValueError(f"{record_class.__name__} fields do not match the {entity_type} spec")
+        namespace[record_class.__name__] = record_class
+        body = ",\n        ".join(values)
+        result = f"{record_class.__name__}(\n        {body}\n    )"
+    else:
+        body = ",\n        ".join(f"{field.name!r}: {value}" for field, value in zip(ENTITY_SPECS[entity_type], values))
+        result = f"{{\n        {body}\n    }}"
+    return f"def project_{entity_type}({signature}):\n" + "".join(line + "\n" for line in lines) + f"    return {result}\n"
+
+def _build(entity_type: str, source: str, namespace: Dict[str, Any], known_attributes: Optional[Set[str]] = None) -> Callable[..., Dict]:
+    code = _generate(entity_type, source, namespace, known_attributes)
+    exec(compile(code, f"<projector {source}:{entity_type}>", "exec"), namespace)
+    projector = namespace.pop(f"project_{entity_type}")
+    projector.source = code
+    return projector
+
+def compile_projector(entity_type: str, source: str, _compiled: Optional[Dict[str, Callable]] = None) -> Callable[..., Dict]:
+    """Generate a function converting one entity of a spec from SDK models ("attribute") or REST JSON ("json")"""
+    compiled = {} if _compiled is None else _compiled
+    if entity_type in compiled:
+        return compiled[entity_type]
+
+    # Nested specs are compiled first and bound by name in the generated code
+    namespace: Dict[str, Any] = {
+        f"project_{field.spec}": compile_projector(field.spec, source, compiled)
+        for field in ENTITY_SPECS[entity_type] if field.spec
+    }
+    if source == "json":
+        compiled[entity_type] = _build(entity_type, source, namespace)
+        return compiled[entity_type]
+
+    # msrest models set every attribute of their _attribute_map, so a projector specialized
+    # for the model class reads those directly instead of checking for them
+    generic = _build(entity_type, source, namespace)
+    by_class: Dict[type, Callable[..., Dict]] = {}
+
+    def specialize(model_class: type) -> Callable[..., Dict]:
+        attribute_map = getattr(model_class, "_attribute_map", None)
+        by_class[model_class] = _build(entity_type, source, namespace, set(attribute_map)) if attribute_map else generic
+        return by_class[model_class]
+
+    # The dispatcher keeps the projector's own signature to avoid repacking arguments
+    arguments = "".join(f", {field.name}" for field in ENTITY_SPECS[entity_type] if field.argument)
+    dispatcher_code = (
+        f"def project_{entity_type}(entity{arguments}):\n"
+        f"    projector = by_class.get(entity.__class__) or specialize(entity.__class__)\n"
+        f"    return projector(entity{arguments})\n"
+    )
+    dispatcher_namespace = {"by_class": by_class, "specialize": specialize}
+    exec(compile(dispatcher_code, f"<projector dispatch:{entity_type}>", "exec"), dispatcher_namespace)
+    project = dispatcher_namespace[f"project_{entity_type}"]
+    project.source = generic.source
+    compiled[entity_type] = project
+    return project
+
+def compile_projectors(source: str, overrides: Optional[Dict[str, Callable[..., Any]]] = None) -> Dict[str, Callable[..., Dict]]:
+    """Compile the projectors of every entity spec for a source, replacing the specs named in overrides"""
+    compiled: Dict[str, Callable] = dict(overrides or {})
+    for entity_type in ENTITY_SPECS:
+        compile_projector(entity_type, source, compiled)
+    return compiled
+
+# Compiled once at import; the extractor picks the set matching its API mode
+SDK_PROJECTORS = compile_projectors("attribute")
+JSON_PROJECTORS = compile_projectors("json")
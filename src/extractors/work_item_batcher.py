@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+class WorkItemBatcher:
+    """Coalesce concurrent work item lookups into batch requests
+
+    A lookup waits up to LINGER seconds for others to join its batch, so the test cases listed by
+    suites extracted concurrently share requests of up to batch_size IDs.
+    """
+
+    LINGER = 0.05
+
+    def __init__(self, fetch_batch: Callable[[List[int]], Awaitable[Dict[int, Any]]], batch_size: int = 200):
+        # Fetches the fields of a list of work items, keyed by work item ID
+        self._fetch_batch = fetch_batch
+        self.batch_size = max(1, batch_size)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"work_items": 0, "batches": 0}
+
+    async def get(self, work_item_id: int) -> Optional[Any]:
+        """Fields of a work item, or None when the batch did not return it"""
+        future = self._pending.get(work_item_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[work_item_id] = future
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.LINGER, self._flush)
+        return await future
+
+    def stats(self) -> Dict[str, int]:
+        """Work items fetched and the batch requests they took"""
+        return dict(self._stats)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            # Keep a reference so the task is not collected before it completes
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: Dict[int, asyncio.Future]) -> None:
+        self._stats["batches"] += 1
+        self._stats["work_items"] += len(batch)
+        try:
+            fields_by_id = await self._fetch_batch(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for work_item_id, future in batch.items():
+            if not future.done():
+                future.set_result(fields_by_id.get(work_item_id))
@@ -1,10 +1,8 @@
+import argparse
 import asyncio
 import logging
-from datetime import datetime
-from pathlib import Path
 from config.config import AzureConfig
 from extractors.azure_test_extractor import AzureTestExtractor
-from utils.json_utils import save_json_data
 
 # Configure logging
 logging.basicConfig(
@@ -13,7 +11,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Azure Test Plans to Xray Migration")
+    parser.add_argument(
+        "--resume",
+        metavar="DIR",
+        help="Resume an interrupted extraction from its checkpoint in the given extraction directory"
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="DIR",
+        help="Run a delta extraction that only re-fetches what changed since the given previous extraction"
+    )
+    return parser.parse_args()
+
 async def main():
+    args = parse_args()
     logger.info("Starting Azure Test Plans to Xray Migration")
     
     # Load configuration
@@ -25,12 +38,17 @@ async def main():
     
     # Extract all data
     logger.info("Starting data extraction from Azure Test Plans")
-    extraction_result = await extractor.extract_all()
+    try:
+        extraction_result = await extractor.extract_all(resume_dir=args.resume, baseline_dir=args.baseline)
+    finally:
+        extractor.client.close()
     
     # Print summary of extracted data
     logger.info("Extraction completed successfully")
     for entity_type, entities in extraction_result.items():
-        logger.info(f"  Extracted {len(entities)} {entity_type}")
+        # Streaming mode reports counts instead of the extracted entities
+        count = entities if isinstance(entities, int) else len(entities)
+        logger.info(f"  Extracted {count} {entity_type}")
     
     logger.info("Azure Test Plans data extraction has been completed successfully")
     logger.info("The extracted data is ready for mapping to Xray format")
@@ -0,0 +1 @@
+# Storage package 
\ No newline at end of file
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from storage.extraction_reader import read_entities
+
+class ExtractionBaseline:
+    """A previous extraction used as the starting point of a delta extraction"""
+    
+    # Test point IDs per lookup, below the SQLite limit on query parameters
+    POINT_QUERY_SIZE = 500
+    # Allowance for the extraction host clock running ahead of Azure DevOps
+    CLOCK_SKEW = timedelta(minutes=5)
+    
+    def __init__(self, baseline_dir: str):
+        self.baseline_dir = baseline_dir
+        self.logger = logging.getLogger(__name__)
+        self._test_steps: Dict[Tuple[int, int], List[Dict]] = {}
+        
+        # Index the steps of every test case by its revision watermark
+        for plan in read_entities(baseline_dir, "test_plans"):
+            for suite in plan.get("test_suites") or []:
+                for case in suite.get("test_cases") or []:
+                    if case.get("revision") is not None:
+                        self._test_steps[(case["id"], case["revision"])] = case.get("steps") or []
+        
+        # Entities of the baseline refer to identities the same way the baseline was written
+        summary = self._read_summary()
+        self.identity_references = summary.get("identity_references", "inline")
+        self.identities = list(read_entities(baseline_dir, "identities"))
+        
+        # Results are looked up plan by plan, so they are indexed on disk rather than held in memory
+        self._scratch_dir = tempfile.TemporaryDirectory(prefix="baseline_results_")
+        self._results = sqlite3.connect(os.path.join(self._scratch_dir.name, "results.db"))
+        latest_completed = self._index_results()
+        if summary.get("extraction_started"):
+            # Runs updated after the baseline started may have gained results it did not read
+            self.results_watermark = self._parse_date(summary["extraction_started"]) - self.CLOCK_SKEW
+        else:
+            # Baselines written before the start time was recorded only know their latest result
+            self.results_watermark = latest_completed
+        self.logger.info(
+            f"Loaded baseline from {baseline_dir}: {len(self._test_steps)} test cases, "
+            f"runs updated up to {self.results_watermark} reused"
+        )
+    
+    def get_unchanged_steps(self, test_case_id: int, revision: Optional[int]) -> Optional[List[Dict]]:
+        """Get the baseline steps of a test case if it is still at the same revision"""
+        if revision is None:
+            return None
+        return self._test_steps.get((test_case_id, revision))
+    
+    def is_run_unchanged(self, run: Any) -> bool:
+        """Check whether a test run was last updated before the baseline results watermark"""
+        if self.results_watermark is None:
+            return False
+        if isinstance(run, dict):
+            # Raw JSON runs carry their dates as ISO strings
+            completed_date = self._parse_date(run.get("completedDate"))
+            run_date = self._parse_date(run.get("lastUpdatedDate")) or completed_date
+        else:
+            completed_date = getattr(run, 'completed_date', None)
+            run_date = getattr(run, 'last_updated_date', None) or completed_date
+        if not isinstance(run_date, datetime) or not completed_date:
+            # Runs still in progress may gain results, so they are always read again
+            return False
+        return self._as_utc(run_date) <= self.results_watermark
+    
+    def iter_carried_over_results(self, point_ids: Iterable[int], refreshed_run_ids: Set[Any]) -> Iterator[Dict]:
+        """Stream the baseline results of test points that were not re-read from their run, in baseline order"""
+        point_ids = list(point_ids)
+        for start in range(0, len(point_ids), self.POINT_QUERY_SIZE):
+            chunk = point_ids[start:start + self.POINT_QUERY_SIZE]
+            rows = self._results.execute(
+                f"SELECT result FROM results WHERE test_point_id IN ({', '.join('?' * len(chunk))}) ORDER BY position",
+                chunk
+            )
+            for (row,) in rows:
+                result = json.loads(row)
+                if result.get("test_run_id") not in refreshed_run_ids:
+                    yield result
+    
+    def close(self) -> None:
+        """Remove the on-disk index of the baseline results"""
+        self._results.close()
+        self._scratch_dir.cleanup()
+    
+    def _read_summary(self) -> Dict[str, Any]:
+        summary_path = os.path.join(self.baseline_dir, "extraction_summary.json")
+        if not os.path.exists(summary_path):
+            return {}
+        with open(summary_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _index_results(self) -> Optional[datetime]:
+        """Index the baseline results by test point and return the latest completed_date among them"""
+        latest = None
+        
+        def rows() -> Iterator[Tuple[Any, str]]:
+            nonlocal latest
+            for result in read_entities(self.baseline_dir, "test_results"):
+                # ISO strings differ in precision and offset, so they are compared as dates
+                completed_date = self._parse_date(result.get("completed_date"))
+                if completed_date and (latest is None or completed_date > latest):
+                    latest = completed_date
+                yield result.get("test_point_id"), json.dumps(result)
+        
+        # Untyped columns keep the values as written, without SQLite type affinity
+        self._results.execute("CREATE TABLE results (position INTEGER PRIMARY KEY, test_point_id, result)")
+        self._results.executemany("INSERT INTO results (test_point_id, result) VALUES (?, ?)", rows())
+        self._results.execute("CREATE INDEX results_by_point ON results (test_point_id)")
+        self._results.commit()
+        return latest
+    
+    @classmethod
+    def _parse_date(cls, value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        # Azure DevOps writes UTC dates with a Z suffix
+        return cls._as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        """Dates without an offset are UTC, as Azure DevOps returns them"""
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
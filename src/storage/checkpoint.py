@@ -0,0 +1,134 @@
+import json
+import os
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+from utils.json_utils import JsonSerializer
+
+class ExtractionCheckpoint:
+    """Durable log of completed extraction work units, used to resume an interrupted extraction
+
+    Units recorded within a scope (the suites and result chunks of a plan) only matter until the
+    unit closing that scope (the plan) is committed. Their data is not held in memory for the run;
+    a resumed run reads it back for the scopes the interrupted run left open, and compact() drops
+    the closed scopes from the log.
+    """
+
+    FILENAME = "checkpoint.ndjson"
+
+    def __init__(self, output_dir: str, serializer: Optional[JsonSerializer] = None):
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self.serializer = serializer or JsonSerializer()
+        self.logger = logging.getLogger(__name__)
+        self._done: Set[Tuple[str, str]] = set()
+        # Data of the units read back from disk that a resumed run may still reuse
+        self._data: Dict[Tuple[str, str], Any] = {}
+        # Units of the scopes not closed yet, dropped once their scope closes
+        self._scopes: Dict[str, Set[Tuple[str, str]]] = {}
+        # Output writer state (file offsets and counts) as of the last committed unit
+        self.writer_state: Optional[Dict[str, Any]] = None
+        self._load()
+        self.resumed = bool(self._done)
+        self._file = open(self.path, "ab")
+
+    def is_done(self, unit: str, key: Any = "") -> bool:
+        """Check whether a work unit has been completed"""
+        return (unit, str(key)) in self._done
+
+    def get(self, unit: str, key: Any = "") -> Any:
+        """Get the data a previous run recorded for a completed work unit, if any"""
+        return self._data.get((unit, str(key)))
+
+    def get_all(self, unit: str) -> Dict[str, Any]:
+        """Get the data a previous run recorded for every completed work unit of a kind, by key"""
+        return {key: data for (kind, key), data in self._data.items() if kind == unit}
+
+    def record(self, unit: str, key: Any = "", data: Any = None, writer_state: Optional[Dict[str, Any]] = None,
+               scope: Any = None, closes_scope: bool = False) -> None:
+        """Record a completed work unit, optionally committing the output writer state with it
+
+        scope names the unit whose commit makes this one obsolete; closes_scope marks this unit as
+        that commit, for the units recorded with its key as their scope.
+        """
+        unit_key = (unit, str(key))
+        entry: Dict[str, Any] = {"unit": unit, "key": unit_key[1]}
+        if scope is not None:
+            entry["scope"] = str(scope)
+        if closes_scope:
+            entry["closes_scope"] = True
+        entry["data"] = data
+        if writer_state is not None:
+            entry["writer_state"] = writer_state
+        self._file.write(self.serializer.dumps_line(entry))
+        self._file.flush()
+        if writer_state is not None:
+            # Commit points must survive a crash, together with the output they refer to
+            os.fsync(self._file.fileno())
+            self.writer_state = writer_state
+        # The caller holds the data; only the fact that the unit is done is kept
+        self._add(unit_key, entry.get("scope"))
+        if closes_scope:
+            self._close_scope(unit_key[1])
+
+    def compact(self) -> None:
+        """Rewrite the log without the units of closed scopes, once no unit of a closed scope is pending"""
+        compacted_path = self.path + ".tmp"
+        self._file.close()
+        kept = dropped = 0
+        with open(self.path, "rb") as source, open(compacted_path, "wb") as target:
+            for line in source:
+                entry = self._parse(line)
+                if entry is None or ("scope" in entry and (entry["unit"], entry["key"]) not in self._done):
+                    dropped += 1
+                    continue
+                target.write(line)
+                kept += 1
+            target.flush()
+            os.fsync(target.fileno())
+        # The log is replaced in one step, so a crash leaves either version intact
+        os.replace(compacted_path, self.path)
+        self._file = open(self.path, "ab")
+        if dropped:
+            self.logger.debug(f"Compacted {self.path}: kept {kept} entries, dropped {dropped}")
+
+    def close(self) -> None:
+        """Close the checkpoint log"""
+        self._file.close()
+
+    def _add(self, unit_key: Tuple[str, str], scope: Optional[str]) -> None:
+        self._done.add(unit_key)
+        if scope is not None:
+            self._scopes.setdefault(scope, set()).add(unit_key)
+
+    def _close_scope(self, scope: str) -> None:
+        for unit_key in self._scopes.pop(scope, ()):
+            self._done.discard(unit_key)
+            self._data.pop(unit_key, None)
+
+    def _parse(self, line: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            # A torn last line from a crash is simply ignored
+            self.logger.warning(f"Ignoring incomplete checkpoint entry in {self.path}")
+            return None
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            for line in f:
+                entry = self._parse(line)
+                if entry is None:
+                    continue
+                unit_key = (entry["unit"], entry["key"])
+                self._add(unit_key, entry.get("scope"))
+                if entry.get("data") is not None:
+                    self._data[unit_key] = entry["data"]
+                if entry.get("closes_scope"):
+                    # Units of a committed scope are never reused, so their data is not kept
+                    self._close_scope(entry["key"])
+                if "writer_state" in entry:
+                    self.writer_state = entry["writer_state"]
+
+        self.logger.info(f"Loaded {len(self._done)} completed work units from {self.path}")
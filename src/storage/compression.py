@@ -0,0 +1,181 @@
+import gzip
+import io
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, IO, Optional
+
+try:
+    import zstandard
+except ImportError:
+    # Optional: only needed for OUTPUT_COMPRESSION=zstd
+    zstandard = None
+
+class Codec(ABC):
+    """Compression codec of extraction files, written in frames that decode as one stream once concatenated"""
+
+    name = ""
+    extension = ""
+    default_level = 0
+
+    def __init__(self, level: int = 0):
+        self.level = level or self.default_level
+
+    @abstractmethod
+    def compressobj(self) -> Any:
+        """Compressor of one frame: compress() chunks, then flush() to end the frame"""
+
+    @staticmethod
+    @abstractmethod
+    def open_reader(path: str) -> IO[bytes]:
+        """Open a compressed file for reading its decompressed bytes"""
+
+class GzipCodec(Codec):
+    """gzip compression; every frame is a gzip member"""
+
+    name = "gzip"
+    extension = ".gz"
+    default_level = 6
+
+    def compressobj(self) -> Any:
+        # wbits=31 writes the gzip header and trailer
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    @staticmethod
+    def open_reader(path: str) -> IO[bytes]:
+        return gzip.open(path, "rb")
+
+class ZstdCodec(Codec):
+    """Zstandard compression; every frame is a zstd frame"""
+
+    name = "zstd"
+    extension = ".zst"
+    default_level = 3
+
+    def __init__(self, level: int = 0):
+        if zstandard is None:
+            raise ValueError("OUTPUT_COMPRESSION=zstd requires the zstandard package (pip install zstandard)")
+        super().__init__(level)
+
+    def compressobj(self) -> Any:
+        # A compressor context serves one stream at a time, and frames of several files are open at once
+        return zstandard.ZstdCompressor(level=self.level).compressobj()
+
+    @staticmethod
+    def open_reader(path: str) -> IO[bytes]:
+        if zstandard is None:
+            raise ValueError(f"Reading {path} requires the zstandard package (pip install zstandard)")
+        # The stream reader closes the file it reads when closed
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.BufferedReader(reader)
+
+CODECS = {
+    "gzip": GzipCodec,
+    "zstd": ZstdCodec
+}
+
+def get_codec(name: str, level: int = 0) -> Optional[Codec]:
+    """Create the codec of a compression setting, or None when output is not compressed"""
+    if name == "none":
+        return None
+    if name not in CODECS:
+        raise ValueError(f"Unknown output compression: {name}")
+    return CODECS[name](level)
+
+def find_file(directory: str, basename: str) -> Optional[str]:
+    """Path of an extraction file, whether it was written plain or compressed"""
+    for extension in ("", *(codec.extension for codec in CODECS.values())):
+        path = os.path.join(directory, basename + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+def open_file(path: str) -> IO[bytes]:
+    """Open an extraction file for reading, decompressing it by its extension"""
+    for codec in CODECS.values():
+        if path.endswith(codec.extension):
+            return codec.open_reader(path)
+    return open(path, "rb")
+
+class CompressedFile:
+    """Binary file written through a codec in independently decodable frames
+
+    finish_frame() ends the current frame, so the file can be truncated back to any
+    offset it returns and still decompress.
+    """
+
+    def __init__(self, path: str, mode: str, codec: Optional[Codec], stats: "WriteStats"):
+        self.name = path
+        self._file = open(path, mode)
+        self._codec = codec
+        self._stats = stats
+        self._compressor = None
+
+    def write(self, data: bytes) -> int:
+        """Write serialized bytes; callers account for the time spent, serialization included"""
+        if self._codec is None:
+            self._file.write(data)
+            self._stats.add(len(data), len(data))
+            return len(data)
+        if self._compressor is None:
+            self._compressor = self._codec.compressobj()
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self._file.write(compressed)
+        self._stats.add(len(data), len(compressed))
+        return len(data)
+
+    def finish_frame(self) -> int:
+        """End the current frame and return the file offset after it"""
+        if self._compressor is not None:
+            started = time.perf_counter()
+            tail = self._compressor.flush()
+            self._file.write(tail)
+            self._compressor = None
+            self._stats.add(0, len(tail))
+            self._stats.seconds += time.perf_counter() - started
+        return self._file.tell()
+
+    def flush(self) -> None:
+        """End the current frame and push everything written to disk"""
+        self.finish_frame()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self.finish_frame()
+        self._file.close()
+
+    def __enter__(self) -> "CompressedFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class WriteStats:
+    """Bytes serialized and written to extraction files, with the time spent serializing, compressing and writing them"""
+
+    def __init__(self, codec: Optional[Codec]):
+        self.compression = codec.name if codec else "none"
+        self.raw_bytes = 0
+        self.written_bytes = 0
+        self.seconds = 0.0
+
+    def add(self, raw_bytes: int, written_bytes: int) -> None:
+        self.raw_bytes += raw_bytes
+        self.written_bytes += written_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Compression ratio and write throughput of the files written so far"""
+        return {
+            "compression": self.compression,
+            "raw_bytes": self.raw_bytes,
+            "written_bytes": self.written_bytes,
+            "compression_ratio": round(self.raw_bytes / self.written_bytes, 2) if self.written_bytes else None,
+            "write_seconds": round(self.seconds, 3),
+            "write_mb_per_second": round(self.raw_bytes / 2 ** 20 / self.seconds, 1) if self.seconds else None
+        }
@@ -0,0 +1,23 @@
+import io
+import json
+import os
+from typing import Any, Dict, Iterator
+from storage.compression import find_file, open_file
+from storage.sqlite_store import SqliteStore, read_store_entities
+
+def read_entities(extraction_dir: str, entity_type: str) -> Iterator[Dict[str, Any]]:
+    """Read the entities of one type from an extraction directory written in any output format and compression"""
+    db_path = os.path.join(extraction_dir, SqliteStore.FILENAME)
+    ndjson_path = find_file(extraction_dir, f"{entity_type}.ndjson")
+    json_path = find_file(extraction_dir, f"{entity_type}.json")
+    
+    if ndjson_path:
+        with io.TextIOWrapper(open_file(ndjson_path), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif json_path:
+        with open_file(json_path) as f:
+            yield from json.load(f)
+    elif os.path.exists(db_path):
+        yield from read_store_entities(db_path, entity_type)
@@ -0,0 +1,90 @@
+import os
+import glob
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+from storage.compression import Codec, CompressedFile, WriteStats
+from utils.json_utils import JsonSerializer
+
+class NdjsonWriter:
+    """Append extracted entities to per-entity NDJSON files as soon as they are extracted"""
+    
+    EXTENSION = ".ndjson"
+    FORMAT = "ndjson"
+    
+    def __init__(self, output_dir: str, serializer: Optional[JsonSerializer] = None, codec: Optional[Codec] = None):
+        self.output_dir = output_dir
+        self.serializer = serializer or JsonSerializer()
+        self.codec = codec
+        self.extension = self.EXTENSION + (codec.extension if codec else "")
+        self.write_stats = WriteStats(codec)
+        self.counts: Dict[str, int] = {}
+        self._files: Dict[str, CompressedFile] = {}
+        # Offsets of files restored from a previous run that have not been reopened
+        self._restored_offsets: Dict[str, int] = {}
+        self.logger = logging.getLogger(__name__)
+        
+    def write(self, entity_type: str, entity: Any) -> None:
+        """Append a single entity as one JSON line"""
+        started = time.perf_counter()
+        self._file(entity_type).write(self.serializer.dumps_line(entity))
+        self.write_stats.seconds += time.perf_counter() - started
+        self.counts[entity_type] += 1
+        
+    def write_many(self, entity_type: str, entities: Iterable[Any]) -> None:
+        """Append several entities of the same type"""
+        for entity in entities:
+            self.write(entity_type, entity)
+    
+    def flush(self) -> None:
+        """Flush all open files to disk, ending their compression frames"""
+        for f in self._files.values():
+            f.flush()
+    
+    def state(self) -> Dict[str, Any]:
+        """Flush all files and return their byte offsets and entity counts"""
+        self.flush()
+        offsets = dict(self._restored_offsets)
+        offsets.update({entity_type: f.tell() for entity_type, f in self._files.items()})
+        return {
+            "offsets": offsets,
+            "counts": dict(self.counts),
+            "output_format": self.FORMAT,
+            "compression": self.write_stats.compression
+        }
+    
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Truncate the output files back to a previously committed state"""
+        if state.get("output_format", self.FORMAT) != self.FORMAT:
+            raise ValueError(f"{self.output_dir} was not written with output_format={self.FORMAT}")
+        compression = state.get("compression", "none")
+        if state and compression != self.write_stats.compression:
+            # Offsets refer to the files of the interrupted run, in its compression
+            raise ValueError(
+                f"{self.output_dir} was written with output_compression={compression}, "
+                f"but this run uses output_compression={self.write_stats.compression}"
+            )
+        offsets = state.get("offsets", {})
+        for file_path in glob.glob(os.path.join(self.output_dir, f"*{self.extension}")):
+            entity_type = os.path.basename(file_path)[:-len(self.extension)]
+            offset = offsets.get(entity_type, 0)
+            if os.path.getsize(file_path) != offset:
+                self.logger.info(f"Discarding uncommitted {entity_type} written after byte {offset}")
+                with open(file_path, "r+b") as f:
+                    f.truncate(offset)
+        self._restored_offsets = {entity_type: offset for entity_type, offset in offsets.items() if offset}
+        self.counts = dict(state.get("counts", {}))
+    
+    def close(self) -> None:
+        """Close all open files"""
+        for entity_type, f in self._files.items():
+            f.close()
+            self.logger.info(f"Saved {self.counts[entity_type]} {entity_type} to {f.name}")
+        self._files = {}
+    
+    def _file(self, entity_type: str) -> CompressedFile:
+        if entity_type not in self._files:
+            file_path = os.path.join(self.output_dir, f"{entity_type}{self.extension}")
+            self._files[entity_type] = CompressedFile(file_path, "ab", self.codec, self.write_stats)
+            self.counts.setdefault(entity_type, 0)
+        return self._files[entity_type]
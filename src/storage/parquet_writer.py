@@ -0,0 +1,118 @@
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    # Optional: only needed for PARQUET_OUTPUT
+    pyarrow = None
+
+def _to_int(value: Any) -> Optional[int]:
+    # REST payloads carry some IDs as strings
+    return None if value is None else int(value)
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    # SDK models hold dates, REST payloads and JSON files hold them as ISO strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def _to_identity_id(value: Any) -> Optional[str]:
+    # Identities are referenced by ID or embedded as a record, depending on IDENTITY_REFERENCES
+    return value.get("id") if isinstance(value, dict) else value
+
+def _column_types() -> Dict[str, Tuple[Any, Optional[Callable[[Any], Any]]]]:
+    """Arrow type and value converter of each kind of column"""
+    return {
+        "int": (pyarrow.int64(), _to_int),
+        "float": (pyarrow.float64(), None),
+        "string": (pyarrow.string(), None),
+        # Low-cardinality columns are dictionary-encoded, in Arrow as in Parquet
+        "category": (pyarrow.dictionary(pyarrow.int32(), pyarrow.string()), None),
+        "date": (pyarrow.timestamp("us", tz="UTC"), _to_datetime),
+        "identity": (pyarrow.string(), _to_identity_id),
+    }
+
+# Columns of the exported entity types; nested fields such as attachments are left to the JSON output
+COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "test_points": [
+        ("id", "int"),
+        ("test_case_id", "int"),
+        ("test_case_title", "string"),
+        ("configuration_id", "int"),
+        ("configuration_name", "category"),
+        ("tester", "identity"),
+        ("outcome", "category"),
+        ("state", "category"),
+        ("plan_id", "int"),
+        ("suite_id", "int"),
+    ],
+    "test_results": [
+        ("id", "int"),
+        ("test_plan_id", "int"),
+        ("test_point_id", "int"),
+        ("test_case_id", "int"),
+        ("test_run_id", "int"),
+        ("configuration_id", "int"),
+        ("outcome", "category"),
+        ("error_message", "string"),
+        ("comment", "string"),
+        ("state", "category"),
+        ("completed_date", "date"),
+        ("duration_in_ms", "float"),
+        ("started_date", "date"),
+        ("run_by", "identity"),
+    ],
+}
+
+def require_pyarrow() -> None:
+    """Fail early when Parquet output is configured without pyarrow"""
+    if pyarrow is None:
+        raise ValueError("PARQUET_OUTPUT requires the pyarrow package (pip install pyarrow)")
+
+class ParquetWriter:
+    """Write test points or test results to a Parquet file, one row group at a time as entities stream in"""
+
+    EXTENSION = ".parquet"
+    ROW_GROUP_SIZE = 65536
+
+    def __init__(self, output_dir: str, entity_type: str, compression: str = "snappy"):
+        require_pyarrow()
+        self.path = os.path.join(output_dir, f"{entity_type}{self.EXTENSION}")
+        self.count = 0
+        self.logger = logging.getLogger(__name__)
+        types = _column_types()
+        self._columns = [(name, types[kind][1]) for name, kind in COLUMNS[entity_type]]
+        self._schema = pyarrow.schema([(name, types[kind][0]) for name, kind in COLUMNS[entity_type]])
+        self._writer = pyarrow.parquet.ParquetWriter(self.path, self._schema, compression=compression)
+        self._rows: List[Any] = []
+
+    def write_many(self, entities: Iterable[Any]) -> None:
+        """Buffer entities, writing a row group whenever enough are buffered"""
+        for entity in entities:
+            self._rows.append(entity)
+            if len(self._rows) >= self.ROW_GROUP_SIZE:
+                self._write_row_group()
+
+    def close(self) -> None:
+        """Write the last row group and the file footer"""
+        self._write_row_group()
+        self._writer.close()
+        self.logger.info(f"Saved {self.count} rows to {self.path}")
+
+    def _write_row_group(self) -> None:
+        if not self._rows:
+            return
+        arrays = []
+        for (name, convert), field in zip(self._columns, self._schema):
+            values = [row.get(name) for row in self._rows]
+            try:
+                # Vectorized: Arrow casts string IDs, ISO dates with an offset and strings to dictionaries
+                arrays.append(pyarrow.array(values).cast(field.type))
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, pyarrow.ArrowNotImplementedError):
+                # Naive dates, embedded identities or mixed types are converted one value at a time
+                arrays.append(pyarrow.array([convert(value) for value in values] if convert else values, type=field.type))
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self._schema))
+        self.count += len(self._rows)
+        self._rows = []
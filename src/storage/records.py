@@ -0,0 +1,105 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, Tuple
+
+class Record(Mapping):
+    """Slotted entity record serialized to the same JSON object as the dict it replaces.
+
+    Records are mappings of their fields that also accept writes to existing keys, so code
+    handling them can equally handle entities read back from disk as plain dicts. Subclasses are
+    slotted dataclasses, which orjson serializes natively; they keep the Mapping equality, so a
+    record equals the dict it was written as.
+    """
+    __slots__: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fields as a dict in schema order; nested records are left as they are"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+@dataclass(slots=True, eq=False)
+class TestStep(Record):
+    """A step of a test case"""
+    id: Any = None
+    action: Any = None
+    expected_result: Any = None
+    step_identifier: Any = None
+    parameters: Any = None
+    data: Any = None
+    title: Any = None
+    parameters_string: Any = None
+
+@dataclass(slots=True, eq=False)
+class TestCase(Record):
+    """A test case of a suite, with its steps"""
+    id: Any = None
+    name: Any = None
+    work_item_id: Any = None
+    work_item_url: Any = None
+    order: Any = None
+    point_assignments: Any = None
+    priority: Any = None
+    description: Any = None
+    revision: Any = None
+    parameters: Any = None
+    steps: Any = None
+
+@dataclass(slots=True, eq=False)
+class TestPoint(Record):
+    """A test point of a suite"""
+    id: Any = None
+    test_case_id: Any = None
+    test_case_title: Any = None
+    configuration_id: Any = None
+    configuration_name: Any = None
+    tester: Any = None
+    outcome: Any = None
+    state: Any = None
+    plan_id: Any = None
+    suite_id: Any = None
+
+@dataclass(slots=True, eq=False)
+class TestResult(Record):
+    """A test result joined to its test point"""
+    id: Any = None
+    test_plan_id: Any = None
+    test_point_id: Any = None
+    test_case_id: Any = None
+    test_run_id: Any = None
+    configuration_id: Any = None
+    outcome: Any = None
+    error_message: Any = None
+    comment: Any = None
+    state: Any = None
+    completed_date: Any = None
+    duration_in_ms: Any = None
+    started_date: Any = None
+    run_by: Any = None
+    attachments: Any = None
+
+def json_default(value: Any) -> Any:
+    """JSON encoder default hook writing records as objects, dates in ISO 8601 and anything else as strings"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
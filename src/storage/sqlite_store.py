@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from storage.compression import WriteStats
+from storage.records import Record
+from utils.json_utils import JsonSerializer
+
+class Table(NamedTuple):
+    """SQLite table of an entity type: queryable columns next to the entity JSON"""
+    key: Tuple[str, ...]
+    columns: Tuple[str, ...] = ()
+    indexes: Tuple[Tuple[str, ...], ...] = ()
+    # Nested child list stored in its own table, and the parent fields its rows are keyed by
+    children: Optional[Tuple[str, str]] = None
+    child_key: Tuple[Tuple[str, str], ...] = ()
+    id_type: str = "INT"
+
+TABLES: Dict[str, Table] = {
+    "test_plans": Table(("id",), ("name", "state"),
+                        children=("test_suites", "test_suites"), child_key=(("plan_id", "id"),)),
+    "test_suites": Table(("plan_id", "id"), ("parent_suite_id", "name", "last_updated_date"),
+                         indexes=(("parent_suite_id",),),
+                         children=("test_cases", "test_cases"), child_key=(("plan_id", "plan_id"), ("suite_id", "id"))),
+    "test_cases": Table(("suite_id", "id"), ("plan_id", "revision", "name", "priority"),
+                        indexes=(("id",), ("plan_id",)),
+                        children=("steps", "test_steps"), child_key=(("test_case_id", "id"), ("revision", "revision"))),
+    "test_steps": Table(("test_case_id", "revision", "position")),
+    "test_points": Table(("id",), ("plan_id", "suite_id", "test_case_id", "configuration_id", "outcome"),
+                         indexes=(("test_case_id", "configuration_id"), ("plan_id", "suite_id"), ("configuration_id",))),
+    "test_results": Table(("test_run_id", "id"), ("test_point_id", "test_case_id", "configuration_id", "test_plan_id", "outcome", "completed_date"),
+                          indexes=(("test_case_id", "configuration_id"), ("test_point_id",), ("test_plan_id",), ("configuration_id", "outcome"))),
+    "test_configurations": Table(("id",), ("name",)),
+    "test_variables": Table(("id",), ("name",)),
+    "identities": Table(("id",), ("display_name", "unique_name"), id_type="TEXT"),
+}
+
+# Steps of test cases without a revision are keyed by this one, as NULL key columns are never equal
+NO_REVISION = 0
+
+# Columns of every table, key first, and the positions of the date columns among them
+COLUMNS: Dict[str, Tuple[str, ...]] = {name: table.key + table.columns for name, table in TABLES.items()}
+DATE_POSITIONS: Dict[str, Tuple[int, ...]] = {
+    name: tuple(position for position, column in enumerate(columns) if column.endswith("_date"))
+    for name, columns in COLUMNS.items()
+}
+
+def _column_definition(table: Table, column: str) -> str:
+    # INT rather than INTEGER: an INTEGER primary key would alias the rowid, which keeps insertion order
+    if column == "id":
+        return f"id {table.id_type}"
+    return f"{column} INT" if column == "position" or column.endswith("_id") else column
+
+
+class SqliteStore:
+    """Write extracted entities to an indexed SQLite database, flattening the plan hierarchy into tables"""
+
+    FILENAME = "extraction.db"
+    FORMAT = "sqlite"
+    # Rows buffered per table before an executemany
+    BATCH_SIZE = 1000
+
+    def __init__(self, output_dir: str, serializer: Optional[JsonSerializer] = None):
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self.serializer = serializer or JsonSerializer(compact=True)
+        self.write_stats = WriteStats(None)
+        self.counts: Dict[str, int] = {}
+        self.logger = logging.getLogger(__name__)
+        self._pending: Dict[str, List[List]] = {name: [] for name in TABLES}
+        # Steps are shared by every suite a test case appears in, so they are written once
+        self._written_steps = set()
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Commits are the checkpoint commit points, so they are synced like the NDJSON files
+        self._connection.execute("PRAGMA synchronous=FULL")
+        for name, table in TABLES.items():
+            columns = ", ".join(_column_definition(table, column) for column in COLUMNS[name])
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} ({columns}, data TEXT NOT NULL, PRIMARY KEY ({', '.join(table.key)}))"
+            )
+        self._connection.commit()
+
+    def write(self, entity_type: str, entity: Any) -> None:
+        """Add an entity, and the children nested in it, to the current transaction"""
+        started = time.perf_counter()
+        self._add(entity_type, entity, {})
+        self.write_stats.seconds += time.perf_counter() - started
+        self.counts[entity_type] = self.counts.get(entity_type, 0) + 1
+
+    def write_many(self, entity_type: str, entities: Iterable[Any]) -> None:
+        """Add several entities of the same type"""
+        for entity in entities:
+            self.write(entity_type, entity)
+
+    def flush(self) -> None:
+        """Insert the buffered rows and commit the transaction"""
+        started = time.perf_counter()
+        for name in TABLES:
+            self._insert(name)
+        self._connection.commit()
+        self.write_stats.seconds += time.perf_counter() - started
+
+    def state(self) -> Dict[str, Any]:
+        """Commit everything written and return the entity counts"""
+        self.flush()
+        return {
+            "counts": dict(self.counts),
+            "output_format": self.FORMAT
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Continue from a previously committed state
+
+        Uncommitted rows were rolled back by SQLite, and rows committed after the last checkpoint
+        are replaced when their work unit is redone, as every table is keyed.
+        """
+        if state and state.get("output_format") != self.FORMAT:
+            raise ValueError(f"{os.path.dirname(self.path)} was not written with output_format={self.FORMAT}")
+        self.counts = dict(state.get("counts", {}))
+
+    def close(self) -> None:
+        """Commit, then build the lookup indexes once every row is in"""
+        self.flush()
+        started = time.perf_counter()
+        for name, table in TABLES.items():
+            for columns in table.indexes:
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name}_{'_'.join(columns)} ON {name} ({', '.join(columns)})"
+                )
+        self._connection.execute("ANALYZE")
+        self._connection.commit()
+        # WAL only serves the extraction; readers of the finished database need no -wal or -shm files
+        self._connection.execute("PRAGMA journal_mode=DELETE")
+        self._connection.close()
+        self.logger.info(f"Indexed {self.path} in {time.perf_counter() - started:.2f}s")
+        for entity_type, count in self.counts.items():
+            self.logger.info(f"Saved {count} {entity_type} to {self.path}")
+
+    def _add(self, name: str, entity: Any, parent_key: Dict[str, Any]) -> None:
+        table = TABLES[name]
+        fields = entity.to_dict() if isinstance(entity, Record) else dict(entity)
+        children = fields.pop(table.children[0], None) if table.children else None
+        values = dict(fields, **parent_key) if parent_key else fields
+        data = self.serializer.dumps_line(fields)[:-1]
+        self.write_stats.add(len(data), len(data))
+        row = list(map(values.get, COLUMNS[name]))
+        for position in DATE_POSITIONS[name]:
+            if isinstance(row[position], datetime):
+                # Dates are stored in the ISO 8601 form of the JSON output
+                row[position] = row[position].isoformat()
+        row.append(data.decode("utf-8"))
+        self._pending[name].append(row)
+        if len(self._pending[name]) >= self.BATCH_SIZE:
+            self._insert(name)
+        if not children:
+            return
+
+        child_name = table.children[1]
+        child_key = {column: values.get(field) for column, field in table.child_key}
+        if child_name == "test_steps":
+            child_key["revision"] = child_key["revision"] or NO_REVISION
+            steps_key = (child_key["test_case_id"], child_key["revision"])
+            if steps_key in self._written_steps:
+                return
+            self._written_steps.add(steps_key)
+        for position, child in enumerate(children):
+            self._add(child_name, child, dict(child_key, position=position))
+
+    def _insert(self, name: str) -> None:
+        rows = self._pending[name]
+        if not rows:
+            return
+        columns = COLUMNS[name] + ("data",)
+        # Keyed rows replace the ones of a work unit redone after a resume
+        self._connection.executemany(
+            f"INSERT OR REPLACE INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows
+        )
+        self._pending[name] = []
+
+def read_store_entities(db_path: str, entity_type: str) -> Iterator[Dict[str, Any]]:
+    """Read the entities of one type back from an extraction database, with their children nested again"""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        yield from _read_table(connection, entity_type, {})
+    finally:
+        connection.close()
+
+def _read_table(connection: sqlite3.Connection, name: str, parent_key: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    table = TABLES[name]
+    where = " AND ".join(f"{column} = ?" for column in parent_key)
+    order = "position" if "position" in table.key else "rowid"
+    query = f"SELECT data FROM {name}{f' WHERE {where}' if where else ''} ORDER BY {order}"
+    for (data,) in connection.execute(query, tuple(parent_key.values())):
+        entity = json.loads(data)
+        if table.children:
+            child_key = {column: entity.get(field, parent_key.get(field)) for column, field in table.child_key}
+            if "revision" in child_key:
+                child_key["revision"] = child_key["revision"] or NO_REVISION
+            entity[table.children[0]] = list(_read_table(connection, table.children[1], child_key))
+        yield entity
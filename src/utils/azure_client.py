@@ -1,7 +1,43 @@
 from azure.devops.connection import Connection
 from msrest.authentication import BasicAuthentication
 from config.config import AzureConfig
+from utils.rate_limiter import AdaptiveRateLimiter
+from utils.retry import RetryPolicy
+from utils.http_pool import PooledHTTPAdapter
+from utils.http_cassette import RecordingHTTPAdapter, ReplayHTTPAdapter
+from utils.http_cache import CachingHTTPAdapter
+from utils.azure_rest import AzureRestClient
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import logging
+import requests
+import threading
+import time
+
+class AsyncClientProxy:
+    """Expose the methods of a synchronous SDK client as coroutines run on a thread pool"""
+    
+    def __init__(self, client, runner):
+        self._client = client
+        self._runner = runner
+        
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+        
+        async def call(*args, **kwargs):
+            return await self._runner(name, functools.partial(attribute, *args, **kwargs))
+        
+        return call
+
+class CallOutcome:
+    """HTTP signals observed while a single SDK call ran on its worker thread"""
+    
+    def __init__(self):
+        self.status_code = None
+        self.throttled = False
 
 class AzureDevOpsClient:
     def __init__(self, config: AzureConfig):
@@ -10,7 +46,39 @@ class AzureDevOpsClient:
         self._test_client = None
         self._work_item_client = None
         self._git_client = None
+        self._rest_client = None
         self.logger = logging.getLogger(__name__)
+        # The SDK clients are blocking, so their calls run on a managed thread pool
+        # sized to the configured concurrency to let the event loop overlap network I/O
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, config.max_concurrent_requests),
+            thread_name_prefix="azure-devops"
+        )
+        # Shared across every call so throttling anywhere slows down the whole extraction
+        self.rate_limiter = AdaptiveRateLimiter(config.max_concurrent_requests)
+        self.retry_policy = RetryPolicy(
+            max_attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay,
+            request_budget=config.retry_request_budget,
+            phase_budget=config.retry_phase_budget
+        )
+        self._thread_state = threading.local()
+        # msrest keeps a session per thread and per SDK client; mounting one adapter on all of
+        # them lets every call reuse the same pool of kept-alive connections
+        pool_maxsize = config.http_pool_maxsize or max(1, config.max_concurrent_requests)
+        if config.http_cache and config.http_cassette_mode != "off":
+            # A cassette would record cache hits as network responses, and replays never reach the network
+            raise ValueError("HTTP_CACHE cannot be combined with HTTP_CASSETTE_MODE")
+        if config.http_cache:
+            self.http_adapter = CachingHTTPAdapter(pool_maxsize, config.http_cache_path)
+        elif config.http_cassette_mode == "record":
+            self.http_adapter = RecordingHTTPAdapter(pool_maxsize, config.http_cassette_path)
+        elif config.http_cassette_mode == "replay":
+            # Every response comes from the cassette, so the extraction runs offline
+            self.http_adapter = ReplayHTTPAdapter(pool_maxsize, config.http_cassette_path, config.http_replay_latency)
+        else:
+            self.http_adapter = PooledHTTPAdapter(pool_maxsize=pool_maxsize)
         
     @property
     def connection(self):
@@ -28,23 +96,36 @@ class AzureDevOpsClient:
     def test_client(self):
         if not self._test_client:
             self.logger.info("Initializing Azure DevOps Test Client")
-            self._test_client = self.connection.clients.get_test_client()
+            self._test_client = self._wrap(self.connection.clients.get_test_client())
         return self._test_client
     
     @property
     def work_item_client(self):
         if not self._work_item_client:
             self.logger.info("Initializing Azure DevOps Work Item Client")
-            self._work_item_client = self.connection.clients.get_work_item_tracking_client()
+            self._work_item_client = self._wrap(self.connection.clients.get_work_item_tracking_client())
         return self._work_item_client
     
     @property
     def git_client(self):
         if not self._git_client:
             self.logger.info("Initializing Azure DevOps Git Client")
-            self._git_client = self.connection.clients.get_git_client()
+            self._git_client = self._wrap(self.connection.clients.get_git_client())
         return self._git_client
     
+    @property
+    def rest_client(self):
+        if not self._rest_client:
+            self.logger.info("Initializing Azure DevOps REST Client")
+            session = requests.Session()
+            session.auth = ('', self.config.personal_access_token)
+            session.headers['Accept'] = 'application/json'
+            self._configure_session(session, None, None)
+            self._configure_headers(session.headers)
+            session.hooks['response'].append(self._on_response)
+            self._rest_client = AsyncClientProxy(AzureRestClient(self.config.organization_url, session), self._run)
+        return self._rest_client
+    
     async def get_work_item(self, work_item_id):
         """Get a work item by ID"""
         try:
@@ -52,4 +133,99 @@ class AzureDevOpsClient:
             return await self.work_item_client.get_work_item(work_item_id, self.config.project_name)
         except Exception as e:
             self.logger.error(f"Error retrieving work item {work_item_id}: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+    
+    def _wrap(self, sdk_client) -> AsyncClientProxy:
+        """Observe the responses of an SDK client and expose it asynchronously"""
+        sdk_client.config.hooks.append(self._on_response)
+        # Retries are handled by the retry policy, which sees every failure and backs off with jitter
+        sdk_client.config.retry_policy.retries = 0
+        # msrest closes its session after every call without keep_alive, and closing a session closes
+        # the adapter shared by every client; HTTP_KEEP_ALIVE=false sends Connection: close instead
+        sdk_client.config.keep_alive = True
+        self._configure_headers(sdk_client.config.headers)
+        sdk_client.config.session_configuration_callback = self._configure_session
+        return AsyncClientProxy(sdk_client, self._run)
+    
+    def _configure_session(self, session, global_config, local_config, **kwargs):
+        """msrest session callback mounting the shared connection pool on the session of the calling thread"""
+        for prefix in ('https://', 'http://'):
+            if session.adapters.get(prefix) is not self.http_adapter:
+                session.mount(prefix, self.http_adapter)
+        return kwargs
+    
+    def _configure_headers(self, headers):
+        """Apply the compression and keep-alive settings to the default headers of a client"""
+        headers['Accept-Encoding'] = 'gzip' if self.config.http_gzip else 'identity'
+        if not self.config.http_keep_alive:
+            headers['Connection'] = 'close'
+    
+    async def prewarm_connections(self):
+        """Open the configured number of connections to the organization ahead of the first calls"""
+        count = self.config.http_prewarm_connections
+        if count <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            opened = await loop.run_in_executor(self._executor, self.http_adapter.prewarm, self.config.organization_url, count)
+            self.logger.info(f"Pre-warmed {opened} connections to {self.config.organization_url}")
+        except Exception as e:
+            self.logger.warning(f"Could not pre-warm connections: {str(e)}")
+    
+    def pool_stats(self):
+        """Connection pool utilization counters"""
+        return self.http_adapter.stats()
+    
+    def retry_phase(self, name: str):
+        """Context manager attributing the calls made within it to an extraction phase"""
+        return self.retry_policy.phase(name)
+    
+    async def _run(self, method_name: str, call):
+        """Run a blocking SDK call on the thread pool within the rate limiter, retrying transient failures"""
+        loop = asyncio.get_running_loop()
+        idempotent = self.retry_policy.is_idempotent(method_name)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.rate_limiter.acquire()
+            outcome = CallOutcome()
+            try:
+                result = await loop.run_in_executor(self._executor, self._invoke, outcome, call)
+            except Exception as e:
+                await self.rate_limiter.release(outcome.throttled)
+                if not self.retry_policy.is_retryable(e, outcome.status_code, idempotent):
+                    raise
+                delay = self.retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    raise
+                self.logger.warning(f"{method_name} failed ({outcome.status_code or type(e).__name__}), retrying in {delay:.1f}s (attempt {attempt + 1} of {self.retry_policy.max_attempts})")
+                await asyncio.sleep(delay)
+                continue
+            
+            await self.rate_limiter.release(outcome.throttled)
+            if attempt > 1:
+                self.retry_policy.record_recovery()
+            return result
+    
+    def _invoke(self, outcome: CallOutcome, call):
+        # Runs on a worker thread; _on_response reports into the outcome of the call on this thread
+        self._thread_state.outcome = outcome
+        try:
+            return call()
+        finally:
+            self._thread_state.outcome = None
+    
+    def _on_response(self, response, *args, **kwargs):
+        """requests response hook reading the Azure DevOps rate limiting headers"""
+        throttled = self.rate_limiter.observe(response.status_code, response.headers)
+        outcome = getattr(self._thread_state, 'outcome', None)
+        if outcome is not None:
+            outcome.status_code = response.status_code
+            outcome.throttled = outcome.throttled or throttled
+        return response
+    
+    def close(self):
+        """Release the worker threads used for SDK calls and the pooled connections"""
+        self._executor.shutdown(wait=False)
+        self.http_adapter.close()
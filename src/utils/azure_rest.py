@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+import requests
+from extractors.json_projections import STEPS_FIELD
+from extractors.projectors import work_item_field_names
+
+class AzureRestClient:
+    """Call the Azure DevOps test REST endpoints directly and return their JSON payloads untouched"""
+
+    API_VERSION = "7.1"
+    # Same default timeout as the SDK
+    TIMEOUT = 100
+    # Test plan list endpoints page with a continuation token header instead of $skip
+    CONTINUATION_HEADER = "x-ms-continuationtoken"
+    # Work item fields returned with the test cases of a suite: those the test case projection reads, and the steps
+    TEST_CASE_FIELDS = ",".join([*work_item_field_names("test_case").values(), STEPS_FIELD])
+
+    def __init__(self, organization_url: str, session: requests.Session):
+        self.organization_url = organization_url.rstrip("/")
+        self.session = session
+
+    def get_test_plans(self, project: str) -> List[Dict]:
+        """List the test plans of a project"""
+        return self._get_all(project, "testplan/plans")
+
+    def get_test_suites(self, project: str, plan_id: int) -> List[Dict]:
+        """List the suites of a test plan"""
+        return self._get_all(project, f"testplan/Plans/{plan_id}/suites")
+
+    def get_test_cases(self, project: str, plan_id: int, suite_id: int) -> List[Dict]:
+        """List the test cases of a suite, with their revision, description, priority and steps"""
+        return self._get_all(
+            project,
+            f"testplan/Plans/{plan_id}/Suites/{suite_id}/TestCase",
+            witFields=self.TEST_CASE_FIELDS
+        )
+
+    def get_points(self, project: str, plan_id: int, suite_id: int) -> List[Dict]:
+        """List the test points of a suite"""
+        return self._get_all(project, f"testplan/Plans/{plan_id}/Suites/{suite_id}/TestPoint")
+
+    def get_test_configurations(self, project: str) -> List[Dict]:
+        """List the test configurations of a project"""
+        return self._get_all(project, "testplan/configurations")
+
+    def get_test_variables(self, project: str) -> List[Dict]:
+        """List the test variables of a project"""
+        return self._get_all(project, "testplan/variables")
+
+    def get_test_runs(self, project: str, plan_id: int, include_run_details: bool = True, skip: int = 0, top: Optional[int] = None) -> List[Dict]:
+        """Get a page of the test runs of a test plan, with their details such as totalTests"""
+        params = {"$skip": skip, "$top": top, "includeRunDetails": "true" if include_run_details else None}
+        return self._get(project, "test/runs", planId=plan_id, **params).json()["value"]
+
+    def get_test_results(self, project: str, run_id: int, skip: int = 0, top: Optional[int] = None) -> List[Dict]:
+        """Get a page of the results of a test run"""
+        return self._get(project, f"test/Runs/{run_id}/results", **{"$skip": skip, "$top": top}).json()["value"]
+
+    def _get_all(self, project: str, route: str, **params: Any) -> List[Dict]:
+        """Get every page of a list endpoint by following its continuation tokens"""
+        items = []
+        while True:
+            response = self._get(project, route, **params)
+            items.extend(response.json()["value"])
+            continuation_token = response.headers.get(self.CONTINUATION_HEADER)
+            if not continuation_token:
+                return items
+            params["continuationToken"] = continuation_token
+
+    def _get(self, project: str, route: str, **params: Any) -> requests.Response:
+        url = f"{self.organization_url}/{quote(project)}/_apis/{route}"
+        params = {name: value for name, value in params.items() if value is not None}
+        params["api-version"] = self.API_VERSION
+        response = self.session.get(url, params=params, timeout=self.TIMEOUT)
+        response.raise_for_status()
+        return response
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from utils.http_cassette import RECORDED_HEADERS, build_response, interaction_key
+from utils.http_pool import PooledHTTPAdapter
+
+# Test run lists, whose runs tell which result pages can no longer change
+RUNS_URL = re.compile(r"/_apis/test/runs(\?|$)", re.IGNORECASE)
+RUN_RESULTS_URL = re.compile(r"/_apis/test/runs/(\d+)/results(\?|$)", re.IGNORECASE)
+COMPLETED_RUN_STATE = "completed"
+# Rate limiting headers describe the organization when a response was sent, so they are never cached
+CACHED_HEADERS = tuple(
+    name for name in RECORDED_HEADERS if name != "Retry-After" and not name.startswith("X-RateLimit-")
+)
+
+class CachedResponse(NamedTuple):
+    """Row of the response cache"""
+    status: int
+    headers: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    # lastUpdatedDate of the completed run of a results page when it was stored
+    run_version: Optional[str]
+
+class CachingHTTPAdapter(PooledHTTPAdapter):
+    """Pooled adapter keeping GET responses in an on-disk SQLite cache
+
+    Cached responses with an ETag or Last-Modified header are revalidated with a conditional
+    request, and a 304 is answered from the cache. Result pages of completed test runs are
+    served from the cache without any request, as long as the run listed by Azure DevOps still
+    has the lastUpdatedDate it had when the page was stored.
+    """
+
+    def __init__(self, pool_maxsize: int, path: str):
+        super().__init__(pool_maxsize)
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._cache_lock = threading.Lock()
+        self._cache_stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stored": 0}
+        # lastUpdatedDate of the completed runs listed by this extraction, by run ID
+        self._completed_runs: Dict[str, str] = {}
+        # Used from every worker thread, always under the cache lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # A cache entry lost in a crash is only fetched again
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (request TEXT PRIMARY KEY, status INT, headers TEXT NOT NULL, "
+            "body BLOB NOT NULL, etag TEXT, last_modified TEXT, run_version TEXT, stored_at REAL)"
+        )
+        self._connection.commit()
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        key = interaction_key(request.method, request.url)
+        cached = self._lookup(key)
+        run_version = self._run_version(request.url)
+        if cached and run_version is not None and cached.run_version == run_version:
+            # Results of a run completed and not updated since they were stored
+            self._count("fresh_hits")
+            return self._cached_response(request, cached)
+
+        if cached and (cached.etag or cached.last_modified):
+            request = request.copy()
+            if cached.etag:
+                request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and cached:
+            # Release the connection; the 304 carries the current rate limiting headers
+            response.content
+            self._count("revalidated")
+            headers = self._cached_headers(cached)
+            headers.update((name, response.headers[name]) for name in RECORDED_HEADERS if name in response.headers)
+            revalidated = build_response(request, cached.status, headers, cached.body, self)
+            self._observe(request.url, revalidated)
+            return revalidated
+
+        self._count("misses")
+        if response.status_code == 200:
+            self._observe(request.url, response)
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+            if etag or last_modified or run_version is not None:
+                self._store(key, response, etag, last_modified, run_version)
+        return response
+
+    def _lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._cache_lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(CachedResponse._fields)} FROM responses WHERE request = ?", (key,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def _store(self, key: str, response, etag: Optional[str], last_modified: Optional[str], run_version: Optional[str]) -> None:
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        with self._cache_lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status_code, json.dumps(headers), response.content, etag, last_modified, run_version, time.time())
+            )
+            self._connection.commit()
+            self._cache_stats["stored"] += 1
+
+    def _cached_response(self, request, cached: CachedResponse):
+        # No request was sent, so no rate limiting signal is reported
+        return build_response(request, cached.status, self._cached_headers(cached), cached.body, self)
+    
+    @staticmethod
+    def _cached_headers(cached: CachedResponse) -> Dict[str, str]:
+        # Caches written before rate limiting headers were left out may still hold them
+        headers = json.loads(cached.headers)
+        return {name: value for name, value in headers.items() if name in CACHED_HEADERS}
+
+    def _run_version(self, url: str) -> Optional[str]:
+        """lastUpdatedDate of the completed run whose results the URL pages through, if it was listed"""
+        match = RUN_RESULTS_URL.search(url)
+        if not match:
+            return None
+        with self._cache_lock:
+            return self._completed_runs.get(match.group(1))
+
+    def _observe(self, url: str, response) -> None:
+        """Note the completed runs of a test run list"""
+        if not RUNS_URL.search(url):
+            return
+        try:
+            runs = json.loads(response.content).get("value", [])
+        except (ValueError, AttributeError):
+            return
+        with self._cache_lock:
+            for run in runs:
+                if str(run.get("state", "")).lower() == COMPLETED_RUN_STATE and run.get("lastUpdatedDate"):
+                    self._completed_runs[str(run["id"])] = run["lastUpdatedDate"]
+
+    def _count(self, name: str) -> None:
+        with self._cache_lock:
+            self._cache_stats[name] += 1
+
+    def stats(self) -> Dict:
+        with self._cache_lock:
+            return dict(super().stats(), cache=dict(self._cache_stats, path=self.path))
+
+    def close(self):
+        super().close()
+        with self._cache_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                self.logger.info(f"HTTP cache {self.path}: {self._cache_stats}")
@@ -0,0 +1,192 @@
+import base64
+import hashlib
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from storage.compression import CompressedFile, GzipCodec, WriteStats, open_file
+from utils.http_pool import PooledHTTPAdapter
+from utils.json_utils import get_serializer
+from utils.retry import RetryPolicy
+
+# Response headers the extraction reads; the rest (session IDs, tracing, cookies) is left out of cassettes
+RECORDED_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "x-ms-continuationtoken",
+    "Retry-After",
+    "X-RateLimit-Resource",
+    "X-RateLimit-Delay",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+)
+
+def interaction_key(method: str, url: str, body: Optional[Union[str, bytes]] = None) -> str:
+    """Key of a request in a cassette: method and URL with its query parameters sorted
+
+    Requests sent with a body, such as work item batches that share one URL, are told apart by a
+    hash of the body with its keys and ID lists sorted.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {urlunsplit(parts._replace(query=query))}"
+    if method.upper() == "GET" or not body:
+        return key
+    return f"{key} #{hashlib.sha256(_normalized_body(body)).hexdigest()[:16]}"
+
+def _normalized_body(body: Union[str, bytes]) -> bytes:
+    """Request body in a canonical form, so the same request always gets the same key"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(data, dict) and isinstance(data.get("ids"), list):
+        data["ids"] = sorted(data["ids"], key=str)
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def build_response(request, status: int, headers: Dict[str, str], body: bytes, connection: Any) -> requests.Response:
+    """Response to a prepared request served from a stored body instead of the network"""
+    response = requests.Response()
+    response.status_code = status
+    response.reason = http.client.responses.get(status, "")
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = body
+    response.url = request.url
+    response.request = request
+    response.connection = connection
+    return response
+
+class RecordingHTTPAdapter(PooledHTTPAdapter):
+    """Pooled adapter that also records every response to a cassette file, one gzip-compressed JSON line each
+
+    Throttled and transient failures are not recorded, so a replay serves what the server
+    answered once it answered, without the retries it took.
+    """
+
+    # Interactions per gzip member; a crash loses at most the member being written
+    FRAME_SIZE = 100
+
+    def __init__(self, pool_maxsize: int, path: str):
+        super().__init__(pool_maxsize)
+        self.path = path
+        self.recorded = 0
+        self.logger = logging.getLogger(__name__)
+        self._serializer = get_serializer("auto", compact=True)
+        self._skipped_status_codes = RetryPolicy.THROTTLED_STATUS_CODES | RetryPolicy.TRANSIENT_STATUS_CODES
+        self._record_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = CompressedFile(path, "wb", GzipCodec(), WriteStats(None))
+        self._closed = False
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code not in self._skipped_status_codes:
+            self._record(request, response)
+        return response
+
+    def _record(self, request, response) -> None:
+        # Bodies are recorded decoded: gzip over the whole cassette compresses them better
+        content = response.content
+        interaction: Dict[str, Any] = {
+            "request": interaction_key(request.method, request.url, request.body),
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+        }
+        try:
+            interaction["body"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            interaction["body_base64"] = base64.b64encode(content).decode("ascii")
+        line = self._serializer.dumps_line(interaction)
+        with self._record_lock:
+            self._file.write(line)
+            self.recorded += 1
+            if self.recorded % self.FRAME_SIZE == 0:
+                self._file.finish_frame()
+
+    def stats(self) -> Dict:
+        return dict(super().stats(), cassette={"mode": "record", "path": self.path, "recorded": self.recorded})
+
+    def close(self):
+        super().close()
+        with self._record_lock:
+            if not self._closed:
+                self._closed = True
+                self._file.close()
+                self.logger.info(f"Recorded {self.recorded} responses to {self.path}")
+
+class ReplayHTTPAdapter(PooledHTTPAdapter):
+    """Adapter serving the responses of a cassette instead of calling the network
+
+    Requests repeated more often than recorded get the last recorded response again.
+    Requests that were never recorded get a 404.
+    """
+
+    def __init__(self, pool_maxsize: int, path: str, latency: float = 0.0):
+        super().__init__(pool_maxsize)
+        self.path = path
+        self.latency = latency
+        self.logger = logging.getLogger(__name__)
+        self._interactions = self._load(path)
+        self._positions: Dict[str, int] = {}
+        self._replay_lock = threading.Lock()
+        self._replay_stats = {"replayed": 0, "unmatched": 0}
+
+    def _load(self, path: str) -> Dict[str, List[Dict]]:
+        if not os.path.exists(path):
+            raise ValueError(f"HTTP cassette not found: {path}")
+        interactions: Dict[str, List[Dict]] = {}
+        count = 0
+        with open_file(path) as f:
+            try:
+                for line in f:
+                    interaction = json.loads(line)
+                    interactions.setdefault(interaction["request"], []).append(interaction)
+                    count += 1
+            except EOFError:
+                # The recording was interrupted inside its last gzip member
+                self.logger.warning(f"HTTP cassette {path} is truncated, replaying the {count} complete responses")
+        self.logger.info(f"Loaded {count} recorded responses for {len(interactions)} requests from {path}")
+        return interactions
+
+    def send(self, request, **kwargs):
+        key = interaction_key(request.method, request.url, request.body)
+        with self._replay_lock:
+            recorded = self._interactions.get(key)
+            if recorded:
+                position = self._positions.get(key, 0)
+                self._positions[key] = position + 1
+                interaction = recorded[min(position, len(recorded) - 1)]
+                self._replay_stats["replayed"] += 1
+            else:
+                interaction = None
+                self._replay_stats["unmatched"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if interaction is None:
+            self.logger.warning(f"No recorded response for {key}")
+            return build_response(request, 404, {"Content-Type": "application/json"}, b'{"message": "Not recorded in the HTTP cassette"}', self)
+        if "body_base64" in interaction:
+            body = base64.b64decode(interaction["body_base64"])
+        else:
+            body = interaction["body"].encode("utf-8")
+        return build_response(request, interaction["status"], interaction["headers"], body, self)
+
+    def prewarm(self, url: str, count: int) -> int:
+        # Nothing to connect to
+        return 0
+
+    def stats(self) -> Dict:
+        with self._replay_lock:
+            return dict(super().stats(), cassette=dict(self._replay_stats, mode="replay", path=self.path))
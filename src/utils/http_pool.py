@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict
+import requests
+import threading
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTP adapter shared by every SDK session so all calls draw from one tuned connection pool"""
+
+    # Distinct hosts kept pooled (organization, resource areas such as vstmr)
+    POOL_CONNECTIONS = 4
+    # Seconds a pre-warming request may take before it is given up
+    PREWARM_TIMEOUT = 10
+
+    def __init__(self, pool_maxsize: int):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        # Retries are handled by the retry policy, so the adapter never retries on its own
+        super().__init__(pool_connections=self.POOL_CONNECTIONS, pool_maxsize=pool_maxsize, max_retries=0, pool_block=False)
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def prewarm(self, url: str, count: int) -> int:
+        """Open up to count connections to the host of url with concurrent HEAD requests, left idle in its pool"""
+        count = min(count, self._pool_maxsize)
+        # Not closed: closing a session closes its adapters, and with them the pool being warmed
+        session = requests.Session()
+        session.mount("http://", self)
+        session.mount("https://", self)
+        opened_before = self._connections_opened()
+        with ThreadPoolExecutor(max_workers=count, thread_name_prefix="prewarm") as executor:
+            # Streamed responses hold on to their connection until closed, so each request opens its own
+            responses = list(executor.map(
+                lambda _: session.head(url, timeout=self.PREWARM_TIMEOUT, stream=True), range(count)
+            ))
+        # The response status does not matter, only the connection it leaves in the pool
+        for response in responses:
+            response.close()
+        with self._lock:
+            # Pre-warming is not part of the extraction's concurrency
+            self._peak_in_flight = 0
+        return self._connections_opened() - opened_before
+
+    def _connections_opened(self) -> int:
+        return sum(self.poolmanager.pools[key].num_connections for key in self.poolmanager.pools.keys())
+
+    def stats(self) -> Dict:
+        """Connection pool utilization across all pooled hosts"""
+        pools = [self.poolmanager.pools[key] for key in self.poolmanager.pools.keys()]
+        requests_sent = sum(pool.num_requests for pool in pools)
+        connections_opened = sum(pool.num_connections for pool in pools)
+        return {
+            "pool_maxsize": self._pool_maxsize,
+            "hosts": len(pools),
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connection_reuse_ratio": round(1 - connections_opened / requests_sent, 3) if requests_sent else 0.0,
+            # Empty pool slots are queued as None placeholders
+            "idle_connections": sum(connection is not None for pool in pools if pool.pool is not None for connection in list(pool.pool.queue)),
+            "peak_in_flight": self._peak_in_flight
+        }
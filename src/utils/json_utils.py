@@ -1,20 +1,94 @@
 import json
-from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, IO, Optional
+from storage.records import json_default
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+try:
+    import orjson
+except ImportError:
+    # Optional: only needed for JSON_BACKEND=orjson
+    orjson = None
 
-def save_json_data(data: Any, filename: str, base_path: str = "data/extraction"):
+class JsonSerializer:
+    """Serializer built on the standard library json module"""
+
+    name = "json"
+    # Items of a list document encoded at a time by dump
+    DUMP_CHUNK_SIZE = 1000
+
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        # Closing bracket of a non-empty list document
+        self._list_end = b"]" if compact else b"\n]"
+        # json.dumps only uses its C encoder without indentation
+        self._document_options = {"separators": (",", ":")} if compact else {"indent": 2}
+        self._line_options = {"separators": (",", ":")} if compact else {}
+
+    def dumps(self, data: Any) -> bytes:
+        """Serialize a JSON document, indented unless in compact mode"""
+        return json.dumps(data, default=json_default, ensure_ascii=False, **self._document_options).encode("utf-8")
+
+    def dumps_line(self, data: Any) -> bytes:
+        """Serialize a single-line JSON value, trailing newline included"""
+        return (json.dumps(data, default=json_default, ensure_ascii=False, **self._line_options) + "\n").encode("utf-8")
+
+    def dump(self, data: Any, f: IO[bytes]) -> int:
+        """Write a JSON document to a binary file and return the number of bytes written
+
+        Lists are encoded DUMP_CHUNK_SIZE items at a time, so only one chunk of the document is
+        held in memory; the bytes are the same as those of dumps.
+        """
+        if not isinstance(data, list) or len(data) <= self.DUMP_CHUNK_SIZE:
+            return f.write(self.dumps(data))
+        written = f.write(b"[")
+        separator = b""
+        for start in range(0, len(data), self.DUMP_CHUNK_SIZE):
+            # A chunk encoded as a list is laid out as it is within the whole list
+            encoded = self.dumps(data[start:start + self.DUMP_CHUNK_SIZE])
+            written += f.write(separator) + f.write(encoded[1:-len(self._list_end)])
+            separator = b","
+        return written + f.write(self._list_end)
+
+class OrjsonSerializer(JsonSerializer):
+    """Serializer built on orjson, which encodes in native code and writes UTF-8 bytes directly"""
+
+    name = "orjson"
+
+    def __init__(self, compact: bool = False):
+        if orjson is None:
+            raise ValueError("JSON_BACKEND=orjson requires the orjson package (pip install orjson)")
+        self.compact = compact
+        self._list_end = b"]" if compact else b"\n]"
+        # Dates are encoded natively, in the same ISO 8601 form json_default writes
+        options = orjson.OPT_NON_STR_KEYS
+        self._document_option = options if compact else options | orjson.OPT_INDENT_2
+        self._line_option = options | orjson.OPT_APPEND_NEWLINE
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=json_default, option=self._document_option)
+
+    def dumps_line(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=json_default, option=self._line_option)
+
+SERIALIZERS = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer
+}
+
+def get_serializer(backend: str = "json", compact: bool = False) -> JsonSerializer:
+    """Create the serializer of a JSON backend; auto picks orjson when it is installed"""
+    if backend == "auto":
+        backend = "orjson" if orjson is not None else "json"
+    if backend not in SERIALIZERS:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    return SERIALIZERS[backend](compact=compact)
+
+def save_json_data(data: Any, filename: str, base_path: str = "data/extraction", serializer: Optional[JsonSerializer] = None):
     """Save data to a JSON file in the specified directory"""
     # Create directory if it doesn't exist
     path = Path(base_path)
     path.mkdir(parents=True, exist_ok=True)
-    
+
     file_path = path / filename
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, cls=DateTimeEncoder, indent=2, ensure_ascii=False) 
\ No newline at end of file
+    with open(file_path, 'wb') as f:
+        (serializer or JsonSerializer()).dump(data, f)
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+class AdaptiveRateLimiter:
+    """Shared throttling guard for Azure DevOps calls.
+    
+    Honors Retry-After with a global backoff and tunes the number of calls in flight
+    with AIMD: +1 slot per window of unthrottled calls, halved on throttling signals.
+    """
+    
+    # Treat the TSTU budget as nearly exhausted below this fraction of X-RateLimit-Limit
+    REMAINING_THRESHOLD = 0.1
+    # Minimum time between two multiplicative decreases, so one throttling burst halves the window once
+    DECREASE_COOLDOWN = 1.0
+    
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.logger = logging.getLogger(__name__)
+        self._in_flight = 0
+        self._backoff_until = 0.0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        # Responses are observed on the SDK worker threads
+        self._lock = threading.Lock()
+        self._stats = {
+            "throttled_responses": 0,
+            "backoff_seconds": 0.0,
+            "concurrency_decreases": 0,
+            "lowest_concurrency": self.max_concurrency
+        }
+    
+    async def acquire(self) -> None:
+        """Wait for the global backoff to pass and for a free slot in the concurrency window"""
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                delay = self._backoff_until - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self._in_flight < max(self.min_concurrency, int(self.limit)):
+                    self._in_flight += 1
+                    return
+                await condition.wait()
+    
+    async def release(self, throttled: bool) -> None:
+        """Free a slot and adapt the concurrency window to the outcome of the call"""
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                if now - self._last_decrease >= self.DECREASE_COOLDOWN:
+                    self._last_decrease = now
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    self._stats["concurrency_decreases"] += 1
+                    self._stats["lowest_concurrency"] = min(self._stats["lowest_concurrency"], int(self.limit))
+                    self.logger.warning(f"Azure DevOps throttling detected, reducing concurrency to {int(self.limit)}")
+            else:
+                # Additive increase: one extra slot per full window of successful calls
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            condition.notify_all()
+    
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> bool:
+        """Record the throttling headers of a response; returns whether it signals throttling"""
+        retry_after = self._parse_retry_after(headers.get("Retry-After"))
+        delay = self._parse_float(headers.get("X-RateLimit-Delay"))
+        remaining = self._parse_float(headers.get("X-RateLimit-Remaining"))
+        limit = self._parse_float(headers.get("X-RateLimit-Limit"))
+        
+        throttled = (
+            status_code == 429
+            or retry_after is not None
+            or (delay is not None and delay > 0)
+            or (remaining is not None and limit and remaining < limit * self.REMAINING_THRESHOLD)
+        )
+        if not throttled:
+            return False
+        
+        with self._lock:
+            self._stats["throttled_responses"] += 1
+            if retry_after is not None:
+                # Back off globally: no new call starts before the server asked us to retry
+                backoff_until = time.monotonic() + retry_after
+                if backoff_until > self._backoff_until:
+                    self._stats["backoff_seconds"] += backoff_until - max(self._backoff_until, time.monotonic())
+                    self._backoff_until = backoff_until
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """Throttling counters for the extraction summary"""
+        with self._lock:
+            return dict(
+                self._stats,
+                backoff_seconds=round(self._stats["backoff_seconds"], 3),
+                current_concurrency=int(self.limit)
+            )
+    
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    @staticmethod
+    def _parse_float(value: Optional[str]) -> Optional[float]:
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+    
+    @classmethod
+    def _parse_retry_after(cls, value: Optional[str]) -> Optional[float]:
+        if value is None:
+            return None
+        seconds = cls._parse_float(value)
+        if seconds is not None:
+            return max(0.0, seconds)
+        try:
+            # Retry-After may also be an HTTP date
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,109 @@
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+import requests
+
+class PhaseEntry(NamedTuple):
+    """An entry into an extraction phase; the retry budget runs from when it was entered"""
+    name: str
+    started: float
+
+# Extraction phase entry the current task is working in, used for per-phase retry budgets
+current_phase: contextvars.ContextVar[Optional[PhaseEntry]] = contextvars.ContextVar("current_phase", default=None)
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, idempotency-aware retry classification and time budgets"""
+    
+    # Rejected before being processed, so safe to re-issue for any method
+    THROTTLED_STATUS_CODES = {429}
+    # Transient server or gateway failures, only re-issued for idempotent calls
+    TRANSIENT_STATUS_CODES = {408, 500, 502, 503, 504}
+    # SDK method prefixes that only read data
+    IDEMPOTENT_PREFIXES = ("get_", "list_", "query_")
+    
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float, request_budget: float, phase_budget: float):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_budget = request_budget
+        self.phase_budget = phase_budget
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats = {"retries": 0, "recovered": 0, "exhausted": 0, "out_of_budget": 0}
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Attribute the calls made in this context to an extraction phase with its own time budget
+
+        Every entry has a budget of its own, so a phase entered again for each plan of a long
+        extraction is not cut off by the time spent on the earlier plans.
+        """
+        token = current_phase.set(PhaseEntry(name, time.monotonic()))
+        try:
+            yield
+        finally:
+            current_phase.reset(token)
+    
+    def is_idempotent(self, method_name: str) -> bool:
+        """Whether a call can be re-issued without side effects"""
+        return method_name.startswith(self.IDEMPOTENT_PREFIXES)
+    
+    def is_retryable(self, error: BaseException, status_code: Optional[int], idempotent: bool) -> bool:
+        """Classify a failed call"""
+        if status_code in self.THROTTLED_STATUS_CODES:
+            return True
+        if not idempotent:
+            return False
+        if status_code in self.TRANSIENT_STATUS_CODES:
+            return True
+        # No HTTP response at all: connection reset, DNS failure or timeout
+        return status_code is None and self._is_connection_error(error)
+    
+    def next_delay(self, attempt: int, started: float) -> Optional[float]:
+        """Delay before the next attempt, or None when attempts or time budgets are exhausted"""
+        if attempt >= self.max_attempts:
+            self._count("exhausted")
+            return None
+        
+        # Full jitter spreads recovering clients out instead of retrying in lockstep
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        now = time.monotonic()
+        if now + delay - started > self.request_budget:
+            self._count("out_of_budget")
+            return None
+        
+        phase = current_phase.get()
+        if phase is not None and now + delay - phase.started > self.phase_budget:
+            self._count("out_of_budget")
+            return None
+        
+        self._count("retries")
+        return delay
+    
+    def record_recovery(self) -> None:
+        """Count a call that succeeded after at least one retry"""
+        self._count("recovered")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retry counters for the extraction summary"""
+        with self._lock:
+            return dict(self._stats)
+    
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+    
+    @staticmethod
+    def _is_connection_error(error: BaseException) -> bool:
+        # The SDK wraps requests exceptions in its own error types
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, ConnectionError, TimeoutError)):
+                return True
+            error = getattr(error, 'inner_exception', None) or error.__cause__ or error.__context__
+        return False
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime, timedelta, timezone
+from storage.baseline import ExtractionBaseline
+
+def write_baseline(baseline_dir, summary, results):
+    (baseline_dir / "extraction_summary.json").write_text(json.dumps(summary))
+    (baseline_dir / "test_results.json").write_text(json.dumps(results))
+
+def test_runs_updated_during_the_baseline_extraction_are_read_again(tmp_path):
+    write_baseline(tmp_path, {"extraction_started": "2024-03-01T12:00:00+00:00"}, [
+        {"id": 1, "test_point_id": 11, "completed_date": "2024-03-02T08:00:00.123Z"}
+    ])
+    baseline = ExtractionBaseline(str(tmp_path))
+    try:
+        # Before the start, so every result of the run was in the baseline
+        assert baseline.is_run_unchanged({"completedDate": "2024-03-01T10:00:00Z", "lastUpdatedDate": "2024-03-01T11:00:00Z"})
+        # Completed while the baseline was extracting other plans, even if before its latest result
+        assert not baseline.is_run_unchanged({"completedDate": "2024-03-01T12:30:00Z", "lastUpdatedDate": "2024-03-01T12:30:00Z"})
+        # Aware SDK dates in another offset compare by instant
+        sdk_run = type("Run", (), {
+            "completed_date": datetime(2024, 3, 1, 13, 0, tzinfo=timezone(timedelta(hours=2))),
+            "last_updated_date": datetime(2024, 3, 1, 13, 0, tzinfo=timezone(timedelta(hours=2)))
+        })()
+        assert baseline.is_run_unchanged(sdk_run)
+    finally:
+        baseline.close()
+
+def test_baselines_without_a_start_time_compare_result_dates_as_dates(tmp_path):
+    write_baseline(tmp_path, {}, [
+        {"id": 1, "test_point_id": 11, "completed_date": "2024-03-01T12:00:00.123Z"},
+        {"id": 2, "test_point_id": 12, "completed_date": "2024-03-01T12:00:00Z"}
+    ])
+    baseline = ExtractionBaseline(str(tmp_path))
+    try:
+        # The string ending in "00Z" sorts above the later "00.123Z"
+        assert baseline.results_watermark == datetime(2024, 3, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)
+        assert list(baseline.iter_carried_over_results([11, 12], set())) == [
+            {"id": 1, "test_point_id": 11, "completed_date": "2024-03-01T12:00:00.123Z"},
+            {"id": 2, "test_point_id": 12, "completed_date": "2024-03-01T12:00:00Z"}
+        ]
+    finally:
+        baseline.close()
@@ -0,0 +1,64 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from utils.http_cassette import RecordingHTTPAdapter, ReplayHTTPAdapter, interaction_key
+
+class WorkItemsBatchHandler(BaseHTTPRequestHandler):
+    """Answers a work item batch with one work item per requested ID"""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"count": len(request["ids"]), "value": [{"id": work_item_id} for work_item_id in request["ids"]]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def post_batch(session: requests.Session, url: str, ids):
+    response = session.post(url, json={"ids": ids, "fields": ["System.Rev"], "errorPolicy": "omit"})
+    return [work_item["id"] for work_item in response.json()["value"]]
+
+def make_session(adapter) -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", adapter)
+    return session
+
+def test_batch_posts_to_the_same_url_replay_their_own_responses(tmp_path):
+    cassette_path = str(tmp_path / "cassette.ndjson.gz")
+    batches = [[1, 2, 3], [4, 5, 6]]
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WorkItemsBatchHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/fakeorg/Migration/_apis/wit/workitemsbatch?api-version=7.1"
+    try:
+        recorder = RecordingHTTPAdapter(2, cassette_path)
+        session = make_session(recorder)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            recorded = list(executor.map(lambda ids: post_batch(session, url, ids), batches))
+        recorder.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert recorded == batches
+
+    replayer = ReplayHTTPAdapter(2, cassette_path)
+    session = make_session(replayer)
+    # Concurrent, in the opposite order, and with the IDs listed differently from the recording
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        replayed = list(executor.map(lambda ids: post_batch(session, url, ids), [[6, 4, 5], [3, 2, 1]]))
+    assert replayed == [[4, 5, 6], [1, 2, 3]]
+    assert replayer.stats()["cassette"]["unmatched"] == 0
+
+def test_get_keys_ignore_the_body_and_query_order():
+    url = "https://dev.azure.com/fakeorg/Migration/_apis/test/runs?planId=1&api-version=7.1"
+    reordered = "https://dev.azure.com/fakeorg/Migration/_apis/test/runs?api-version=7.1&planId=1"
+    assert interaction_key("GET", url) == interaction_key("get", reordered, b"")
+    assert interaction_key("POST", url, b'{"ids": [2, 1]}') == interaction_key("POST", url, b'{"ids":[1,2]}')
+    assert interaction_key("POST", url, b'{"ids": [1]}') != interaction_key("POST", url, b'{"ids": [2]}')
@@ -0,0 +1,22 @@
+import io
+import pytest
+from utils.json_utils import SERIALIZERS, get_serializer, orjson
+
+@pytest.mark.parametrize("backend", [backend for backend in SERIALIZERS if backend != "orjson" or orjson])
+@pytest.mark.parametrize("compact", [False, True])
+def test_dump_streams_lists_in_chunks_with_the_bytes_of_dumps(backend, compact, monkeypatch):
+    serializer = get_serializer(backend, compact=compact)
+    monkeypatch.setattr(serializer, "DUMP_CHUNK_SIZE", 2)
+    writes = []
+
+    class RecordingFile(io.BytesIO):
+        def write(self, data):
+            writes.append(len(data))
+            return super().write(data)
+
+    for data in ([], [{"id": 1}], [{"id": i, "name": "é", "tags": [i, {"nested": None}]} for i in range(5)], {"counts": [1, 2, 3]}):
+        f = RecordingFile()
+        assert serializer.dump(data, f) == len(f.getvalue())
+        assert f.getvalue() == serializer.dumps(data)
+    # The five-item list was written chunk by chunk
+    assert len(writes) > 4
@@ -0,0 +1,28 @@
+import json
+from datetime import datetime, timezone
+from storage import records
+from storage.records import json_default
+from utils.json_utils import OrjsonSerializer, JsonSerializer, orjson
+
+def make_test_case():
+    return records.TestCase(1000, "Login", steps=[records.TestStep(2, "do it", "ok")], revision=datetime(2024, 3, 1, tzinfo=timezone.utc))
+
+def test_records_are_mappings_of_their_fields():
+    test_case = make_test_case()
+    as_dict = dict(test_case)
+
+    assert list(as_dict) == list(records.TestCase.__slots__)
+    assert as_dict == test_case.to_dict() == test_case
+    assert dict(test_case.items())["name"] == test_case.get("name") == test_case["name"] == "Login"
+    assert "steps" in test_case and "missing" not in test_case
+    test_case["name"] = "Logout"
+    assert test_case.name == "Logout"
+
+def test_records_serialize_like_the_dicts_they_replace():
+    test_case = make_test_case()
+    as_dicts = dict(test_case, steps=[dict(step) for step in test_case.steps])
+    serializers = [JsonSerializer()] + ([OrjsonSerializer()] if orjson else [])
+
+    for serializer in serializers:
+        assert serializer.dumps_line(test_case) == serializer.dumps_line(as_dicts)
+    assert json.loads(JsonSerializer().dumps(test_case)) == json.loads(json.dumps(as_dicts, default=json_default))
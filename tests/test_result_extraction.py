@@ -0,0 +1,126 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+from msrest.authentication import BasicAuthentication
+from azure.devops.released.test import test_client
+from config.config import AzureConfig
+from extractors.azure_test_extractor import AzureTestExtractor
+from storage.checkpoint import ExtractionCheckpoint
+
+TEST_RUNS_LOCATION = "cadb3810-d47d-4a3c-a234-fe5f3be50138"
+TEST_RESULTS_LOCATION = "4637d869-3a76-4468-8057-0bb02aa385cf"
+
+class FakeTestClient(test_client.TestClient):
+    """The released SDK test client, answering from canned payloads instead of the network
+
+    Every public method is the real one, so a call with arguments the SDK does not accept fails
+    with the TypeError it would raise against Azure DevOps.
+    """
+
+    def __init__(self, point_ids=(11, 12, 11), latency=0.0, failing_location=None):
+        super().__init__(base_url="https://dev.azure.com/fake", creds=BasicAuthentication("", "unused"))
+        self.point_ids = point_ids
+        self.latency = latency
+        self.failing_location = failing_location
+        self.requests = []
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _send(self, http_method, location_id, version, route_values=None, query_parameters=None, content=None, **kwargs):
+        query_parameters = query_parameters or {}
+        with self._lock:
+            self.requests.append((location_id, route_values, query_parameters))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if location_id == self.failing_location:
+            raise ValueError(f"Request to {location_id} failed")
+        if location_id == TEST_RUNS_LOCATION:
+            value = [{"id": 7, "state": "Completed"}]
+            # Like Azure DevOps, the run size is only returned along with the run details
+            if query_parameters.get("includeRunDetails") == "true":
+                value[0]["totalTests"] = len(self.point_ids)
+        elif location_id == TEST_RESULTS_LOCATION:
+            skip = int(query_parameters.get("$skip") or 0)
+            top = int(query_parameters.get("$top") or len(self.point_ids))
+            value = [
+                {"id": 100000 + index, "testPoint": {"id": str(point_id)}, "testRun": {"id": "7"}, "outcome": "Passed"}
+                for index, point_id in enumerate(self.point_ids)
+            ][skip:skip + top]
+        else:
+            raise AssertionError(f"Unexpected request to {location_id}")
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json; charset=utf-8"})
+        response._content = json.dumps({"count": len(value), "value": value}).encode("utf-8")
+        return response
+
+def test_default_strategy_reads_results_through_the_sdk_test_client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    extractor = AzureTestExtractor(AzureConfig(
+        organization_url="https://dev.azure.com/fake",
+        personal_access_token="unused",
+        project_name="Migration"
+    ))
+    fake_client = FakeTestClient()
+    extractor.client._test_client = extractor.client._wrap(fake_client)
+    try:
+        results = asyncio.run(extractor._extract_results_for_plan_points(1, [{"id": 11}, {"id": 12}]))
+    finally:
+        extractor.client.close()
+
+    assert [(result["id"], result["test_point_id"]) for result in results] == [(100000, 11), (100002, 11), (100001, 12)]
+    assert [location_id for location_id, _, _ in fake_client.requests] == [TEST_RUNS_LOCATION, TEST_RESULTS_LOCATION]
+    assert fake_client.requests[1][1]["runId"] == "7"
+
+def test_sdk_runs_report_their_size_so_result_pages_are_read_in_parallel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    extractor = AzureTestExtractor(AzureConfig(
+        organization_url="https://dev.azure.com/fake",
+        personal_access_token="unused",
+        project_name="Migration",
+        max_concurrent_requests=4,
+        results_page_size=2
+    ))
+    fake_client = FakeTestClient(point_ids=(11, 12, 13, 14, 15, 16, 17), latency=0.05)
+    extractor.client._test_client = extractor.client._wrap(fake_client)
+    try:
+        results = asyncio.run(extractor._extract_results_for_plan_points(1, [{"id": point_id} for point_id in range(11, 18)]))
+    finally:
+        extractor.client.close()
+
+    assert sorted(result["id"] for result in results) == list(range(100000, 100007))
+    runs_request, *results_requests = fake_client.requests
+    assert runs_request[2]["includeRunDetails"] == "true"
+    assert sorted(int(query["$skip"]) for _, _, query in results_requests) == [0, 2, 4, 6]
+    assert fake_client.max_in_flight > 1
+
+def test_failed_results_are_not_checkpointed_as_an_empty_unit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    extractor = AzureTestExtractor(AzureConfig(
+        organization_url="https://dev.azure.com/fake",
+        personal_access_token="unused",
+        project_name="Migration",
+        retry_max_attempts=1
+    ))
+    extractor.client._test_client = extractor.client._wrap(FakeTestClient(failing_location=TEST_RESULTS_LOCATION))
+    extractor._checkpoint = checkpoint = ExtractionCheckpoint(str(tmp_path))
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(extractor._extract_results_for_plan_points(1, [{"id": 11}, {"id": 12}]))
+    finally:
+        checkpoint.close()
+        extractor.client.close()
+
+    # A resumed run must extract the plan's results again
+    resumed_checkpoint = ExtractionCheckpoint(str(tmp_path))
+    resumed_checkpoint.close()
+    assert not resumed_checkpoint.is_done("plan_results", 1)
@@ -0,0 +1,53 @@
+from utils import retry
+from utils.retry import RetryPolicy
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_policy(phase_budget: float = 3600.0) -> RetryPolicy:
+    return RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=1.0, request_budget=86400.0, phase_budget=phase_budget)
+
+def test_phase_entered_again_gets_a_fresh_budget(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry.time, "monotonic", clock)
+    policy = make_policy()
+
+    # First plan
+    with policy.phase("test_results"):
+        assert policy.next_delay(1, clock()) is not None
+        clock.now += 60
+
+    # A later plan enters the same phase two hours into the extraction
+    clock.now += 7200
+    with policy.phase("test_results"):
+        assert policy.next_delay(1, clock()) is not None
+
+    assert policy.stats()["out_of_budget"] == 0
+
+def test_phase_budget_applies_within_one_entry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry.time, "monotonic", clock)
+    policy = make_policy()
+
+    with policy.phase("test_results"):
+        clock.now += 3600
+        assert policy.next_delay(1, clock()) is None
+
+    assert policy.stats()["out_of_budget"] == 1
+
+def test_nested_entries_keep_their_own_budget(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry.time, "monotonic", clock)
+    policy = make_policy()
+
+    with policy.phase("test_plans"):
+        clock.now += 3500
+        with policy.phase("test_points"):
+            clock.now += 200
+            assert policy.next_delay(1, clock()) is not None
+        # Back in the outer entry, whose budget is spent
+        assert policy.next_delay(1, clock()) is None
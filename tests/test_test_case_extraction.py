@@ -0,0 +1,82 @@
+import asyncio
+import json
+import requests
+from requests.structures import CaseInsensitiveDict
+from msrest.authentication import BasicAuthentication
+from azure.devops.released.test import test_client
+from azure.devops.released.work_item_tracking import work_item_tracking_client
+from config.config import AzureConfig
+from extractors.azure_test_extractor import AzureTestExtractor
+
+SUITE_TEST_CASES_LOCATION = "a4a1ec1c-b03f-41ca-8857-704594ecf58e"
+WORK_ITEMS_BATCH_LOCATION = "908509b6-4248-4475-a1cd-829139ba419f"
+STEPS_XML = (
+    '<steps id="0" last="2"><step id="2" type="ActionStep">'
+    '<parameterizedString isformatted="true">Sign in</parameterizedString>'
+    '<parameterizedString isformatted="true">Home page shown</parameterizedString><description/></step></steps>'
+)
+
+def json_response(payload):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json; charset=utf-8"})
+    response._content = json.dumps(payload).encode("utf-8")
+    return response
+
+class FakeTestClient(test_client.TestClient):
+    """The released SDK test client, listing suite test cases as Azure DevOps returns them"""
+
+    def __init__(self):
+        super().__init__(base_url="https://dev.azure.com/fake", creds=BasicAuthentication("", "unused"))
+
+    def _send(self, http_method, location_id, version, route_values=None, query_parameters=None, content=None, **kwargs):
+        assert location_id == SUITE_TEST_CASES_LOCATION, f"Unexpected request to {location_id}"
+        # The work item is only referenced, by a string ID; its fields are not included
+        value = [
+            {
+                "testCase": {"id": str(case_id), "name": f"Case {case_id}", "url": f"https://dev.azure.com/fake/_apis/wit/workItems/{case_id}"},
+                "pointAssignments": [{"configuration": {"id": "1", "name": "Windows"}, "tester": {"id": "u1", "displayName": "Tester"}}]
+            }
+            for case_id in (1001, 1002)
+        ]
+        return json_response({"count": len(value), "value": value})
+
+class FakeWorkItemClient(work_item_tracking_client.WorkItemTrackingClient):
+    """The released SDK work item client, answering batch requests from canned fields"""
+
+    def __init__(self):
+        super().__init__(base_url="https://dev.azure.com/fake", creds=BasicAuthentication("", "unused"))
+        self.batches = []
+
+    def _send(self, http_method, location_id, version, route_values=None, query_parameters=None, content=None, **kwargs):
+        assert location_id == WORK_ITEMS_BATCH_LOCATION, f"Unexpected request to {location_id}"
+        self.batches.append(content)
+        value = [
+            {"id": work_item_id, "rev": 4, "fields": {"System.Rev": 4, "Microsoft.VSTS.Common.Priority": 2, "Microsoft.VSTS.TCM.Steps": STEPS_XML}}
+            for work_item_id in content["ids"]
+        ]
+        return json_response({"count": len(value), "value": value})
+
+def test_sdk_test_cases_are_read_from_their_work_item_reference(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    extractor = AzureTestExtractor(AzureConfig(
+        organization_url="https://dev.azure.com/fake",
+        personal_access_token="unused",
+        project_name="Migration",
+        max_concurrent_requests=4
+    ))
+    work_item_client = FakeWorkItemClient()
+    extractor.client._test_client = extractor.client._wrap(FakeTestClient())
+    extractor.client._work_item_client = extractor.client._wrap(work_item_client)
+    try:
+        test_cases = asyncio.run(extractor._extract_test_cases(1, 2))
+    finally:
+        extractor.client.close()
+
+    assert [(case["id"], case["work_item_id"], case["name"]) for case in test_cases] == [(1001, 1001, "Case 1001"), (1002, 1002, "Case 1002")]
+    assert [(case["revision"], case["priority"]) for case in test_cases] == [(4, 2), (4, 2)]
+    assert test_cases[0]["point_assignments"][0]["configuration_id"] == "1"
+    assert [step["action"] for step in test_cases[1]["steps"]] == ["Sign in"]
+    # Both test cases shared one batch request, and their steps were cached apart
+    assert [batch["ids"] for batch in work_item_client.batches] == [[1001, 1002]]
+    assert set(extractor._caches["test_steps"]) == {(1001, 4), (1002, 4)}